@@ -0,0 +1,124 @@
+"""
+JWT authentication with a per-process user cache.
+
+Tokens issued by ``UserRefreshToken`` carry the user's ``is_organizer`` and
+``is_active`` flags next to the user id, so clients can read their role
+without a profile request and a deactivated user's token is refused before
+any lookup. ``CachedJWTAuthentication`` keeps user rows in an LRU with a
+short TTL (``AUTH_USER_CACHE``), saving the primary-key query most
+requests would otherwise make. Entries are dropped whenever the user is
+saved or deleted (see ``signals``); other processes see such a change when
+their entry expires.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+DEFAULTS = {
+    'MAX_SIZE': 10000,
+    'TTL_SECONDS': 60,
+}
+
+TOKEN_CLAIMS = ('is_organizer', 'is_active')
+
+
+def get_setting(name):
+    return getattr(settings, 'AUTH_USER_CACHE', {}).get(name, DEFAULTS[name])
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token whose claims (and so its access tokens') include ``TOKEN_CLAIMS``."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in TOKEN_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class UserCache:
+    """
+    Thread-safe LRU of user rows keyed by id. Rows are stored as field values
+    and rebuilt into a fresh ``User`` per lookup, so requests never share
+    (or mutate) one instance.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.fields = [field.attname for field in User._meta.concrete_fields]
+
+    # Keys are strings: the user id claim of a token is one.
+    def get(self, user_id):
+        user_id = str(user_id)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires <= now:
+                del self.entries[user_id]
+                return None
+            self.entries.move_to_end(user_id)
+        return User.from_db('default', self.fields, values)
+
+    def set(self, user):
+        values = [getattr(user, field) for field in self.fields]
+        with self.lock:
+            self.entries[str(user.pk)] = (time.monotonic() + get_setting('TTL_SECONDS'), values)
+            self.entries.move_to_end(str(user.pk))
+            while len(self.entries) > get_setting('MAX_SIZE'):
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that looks users up in ``user_cache`` first."""
+
+    def get_cached_user(self, validated_token):
+        """Return the token's user from the cache, or None on a miss."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+        if validated_token.get('is_active') is False:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        user = user_cache.get(user_id)
+        if user is not None:
+            # The checks JWTAuthentication.get_user makes on a fresh row.
+            if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+                raise AuthenticationFailed("User is inactive", code="user_inactive")
+            if api_settings.CHECK_REVOKE_TOKEN and (
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+            ):
+                raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return user
+
+    def get_user(self, validated_token):
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+        return user
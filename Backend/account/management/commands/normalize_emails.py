@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.functions import Lower, Trim
+
+from account.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Lower-case the stored email of users saved before emails were normalized, so "
+        "login's exact lookup finds them. Addresses that would collide with another "
+        "account are reported and left alone."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        stale = User.objects.exclude(email=Lower(Trim('email'))).order_by('id')
+        taken = set(User.objects.filter(
+            email__in=[User.objects.normalize_email(email) for email in stale.values_list('email', flat=True)]
+        ).values_list('email', flat=True))
+
+        updates, conflicts = [], []
+        for user in stale.only('id', 'email'):
+            email = User.objects.normalize_email(user.email)
+            if email in taken:
+                conflicts.append(user)
+                continue
+            taken.add(email)
+            user.email = email
+            updates.append(user)
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                User.objects.bulk_update(updates, ['email'], batch_size=500)
+
+        prefix = "Would normalize" if options['dry_run'] else "Normalized"
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {len(updates)} email(s)."))
+        for user in conflicts:
+            self.stdout.write(self.style.WARNING(
+                f"User {user.id} ({user.email}) collides with an existing account; merge or rename it by hand."
+            ))
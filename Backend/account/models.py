@@ -4,6 +4,14 @@ from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager, Permi
 
 
 class UserManager(BaseUserManager):
+    @classmethod
+    def normalize_email(cls, email):
+        """
+        Lower-case the whole address. Emails are stored in this form, so
+        lookups can be exact matches on the unique index.
+        """
+        return (email or '').strip().lower()
+
     def create_user(self, email, password=None):
         if not email:
             raise ValueError('Users must have an email address')
@@ -47,6 +55,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     objects = UserManager()
     USERNAME_FIELD = 'email'
 
+    def save(self, *args, **kwargs):
+        self.email = User.objects.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.email
 
@@ -1,6 +1,6 @@
 from rest_framework import serializers, status
 from .models import User
-from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import UserRefreshToken
 
 
 class SignupSerializer(serializers.ModelSerializer):
@@ -19,25 +19,24 @@ class SignupSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at', 'updated_at')
 
     def validate(self, attrs):
-        email = attrs.get('email')
+        attrs['email'] = User.objects.normalize_email(attrs.get('email'))
         request = self.context.get('request')
         if request.method == 'POST':
-            if User.objects.filter(email__iexact=email).exists():
+            if User.objects.filter(email=attrs['email']).exists():
                 raise serializers.ValidationError('User with this email already exists! Please try another email')
             return attrs
 
     def create(self, validated_data):
-        newuser = User.objects.create(
-
-        first_name=validated_data['first_name'],
-        last_name=validated_data['last_name'],
-        email=validated_data['email'],
-        password=validated_data['password'],
-        phone=validated_data['phone'],
-        is_verified=True,
-        is_active=True,
-        is_approved=True,
+        newuser = User(
+            first_name=validated_data['first_name'],
+            last_name=validated_data['last_name'],
+            email=validated_data['email'],
+            phone=validated_data['phone'],
+            is_verified=True,
+            is_active=True,
+            is_approved=True,
         )
+        # One hash and one INSERT; the raw password is never stored.
         newuser.set_password(validated_data['password'])
         newuser.save()
         return newuser
@@ -66,14 +65,16 @@ class LoginSerializer(serializers.ModelSerializer):
         password = attrs.get('password')
 
         try:
-            user = User.objects.get(email__iexact=email)
+            # Emails are stored normalized: an exact match uses the unique index.
+            user = User.objects.get(email=User.objects.normalize_email(email))
         except User.DoesNotExist:
             raise serializers.ValidationError({"error": "provide credential are not valid/email"}, code=status.HTTP_401_UNAUTHORIZED)
         if user:
+            # Re-hashes the stored password when the hasher settings changed.
             if not user.check_password(password):
                 raise serializers.ValidationError({"error": "provide credential are not valid/password"}, code=status.HTTP_401_UNAUTHORIZED)
 
-        token = RefreshToken.for_user(user)
+        token = UserRefreshToken.for_user(user)
         attrs = {}
         attrs['id'] = str(user.id)
         attrs['first_name'] = str(user.first_name)
@@ -101,6 +102,13 @@ class UserProfileSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'is_verified', 'is_approved', 'created_at', 'updated_at']
 
+    def validate_email(self, value):
+        # The unique check above compared the address before normalization.
+        value = User.objects.normalize_email(value)
+        if User.objects.filter(email=value).exclude(pk=self.instance.pk if self.instance else None).exists():
+            raise serializers.ValidationError("user with this email already exists.")
+        return value
+
 
 class ChangePasswordSerializer(serializers.Serializer):
     old_password = serializers.CharField(required=True)
@@ -0,0 +1,135 @@
+"""
+The viewer's role in a committee, resolved in one query and memoized on
+the request.
+
+``committee_access`` and ``membership_access`` fetch the committee (or a
+membership with its committee and member) with the viewer's own membership
+status annotated, so telling an organizer from an active or former member
+needs no second query. The result is kept on the request: later checks in
+the same request, such as the sync queryset builder behind an async view,
+reuse it. Lists filter with the models' ``visible_to`` querysets instead,
+and ``with_related`` loads the rows those checks and the serializers read.
+"""
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import PermissionDenied
+
+from .models import Committee, Membership
+
+ORGANIZER = 'organizer'
+MEMBER = 'member'
+FORMER_MEMBER = 'former_member'
+ROLES = (ORGANIZER, MEMBER, FORMER_MEMBER)
+
+
+class CommitteeAccess:
+    """
+    ``user``'s ``role`` in ``committee``, None for outsiders. ``membership``
+    is the row the access was resolved through, if any, and
+    ``viewer_membership_id`` the id of the user's own membership.
+    """
+
+    def __init__(self, user, committee, status, membership=None, viewer_membership_id=None):
+        self.user = user
+        self.committee = committee
+        self.membership = membership
+        self.viewer_membership_id = viewer_membership_id
+        if committee.organizer_id == user.id:
+            self.role = ORGANIZER
+        elif status == 'ACTIVE':
+            self.role = MEMBER
+        elif status:
+            self.role = FORMER_MEMBER
+        else:
+            self.role = None
+
+    @property
+    def is_organizer(self):
+        return self.role == ORGANIZER
+
+    @property
+    def owns_membership(self):
+        return self.membership is not None and self.membership.member_id == self.user.id
+
+    def require(self, *roles, message):
+        if self.role not in roles:
+            raise PermissionDenied(message)
+        return self
+
+
+def _viewer(user, committee):
+    own = Membership.objects.filter(committee=OuterRef(committee), member_id=user.id)
+    return {
+        'viewer_status': Subquery(own.values('status')[:1]),
+        'viewer_membership_id': Subquery(own.values('id')[:1]),
+    }
+
+
+def _memo(request):
+    # Kept on the Django request, which a DRF request and its views share.
+    request = getattr(request, '_request', request)
+    if not hasattr(request, '_committee_access'):
+        request._committee_access = {}
+    return request._committee_access
+
+
+def _committees(user):
+    return Committee.objects.annotate(**_viewer(user, 'pk'))
+
+
+def _memberships(user):
+    return Membership.objects.with_related().annotate(**_viewer(user, 'committee_id'))
+
+
+def _remember(memo, user, row, committee, membership=None):
+    status, viewer_membership_id = row.viewer_status, row.viewer_membership_id
+    access = CommitteeAccess(user, committee, status, membership, viewer_membership_id)
+    memo.setdefault(
+        ('committee', committee.id, user.id), CommitteeAccess(user, committee, status, None, viewer_membership_id)
+    )
+    if membership is not None:
+        memo[('membership', membership.id, user.id)] = access
+    return access
+
+
+def committee_access(request, committee_id):
+    """The ``CommitteeAccess`` of ``request.user`` to a committee; 404 if it does not exist."""
+    user, memo = request.user, _memo(request)
+    access = memo.get(('committee', committee_id, user.id))
+    if access is None:
+        committee = get_object_or_404(_committees(user), id=committee_id)
+        access = _remember(memo, user, committee, committee)
+    return access
+
+
+def membership_access(request, membership_id):
+    """The ``CommitteeAccess`` of ``request.user`` through a membership; 404 if it does not exist."""
+    user, memo = request.user, _memo(request)
+    access = memo.get(('membership', membership_id, user.id))
+    if access is None:
+        membership = get_object_or_404(_memberships(user), id=membership_id)
+        access = _remember(memo, user, membership, membership.committee, membership)
+    return access
+
+
+async def acommittee_access(request, committee_id):
+    user, memo = request.user, _memo(request)
+    access = memo.get(('committee', committee_id, user.id))
+    if access is None:
+        committee = await _committees(user).filter(id=committee_id).afirst()
+        if committee is None:
+            raise Http404
+        access = _remember(memo, user, committee, committee)
+    return access
+
+
+async def amembership_access(request, membership_id):
+    user, memo = request.user, _memo(request)
+    access = memo.get(('membership', membership_id, user.id))
+    if access is None:
+        membership = await _memberships(user).filter(id=membership_id).afirst()
+        if membership is None:
+            raise Http404
+        access = _remember(memo, user, membership, membership.committee, membership)
+    return access
@@ -1,13 +1,33 @@
 from django.contrib import admin
+from conf.pagination import EstimatedCountPaginator
 from .models import Committee, Membership, Contribution, Payout
 
 # Register your models here.
+# Changelists select the rows their columns and __str__ methods read, and
+# large tables skip the exact COUNT(*) (EstimatedCountPaginator and
+# show_full_result_count).
 
 
 class CommitteeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'organizer', 'status', 'start_date', 'end_date', 'total_collected', 'created_at', 'updated_at')   
+    list_display = ('name', 'organizer', 'status', 'start_date', 'end_date', 'total_collected', 'current_members_count', 'created_at', 'updated_at')
     search_fields = ('name', 'organizer__email')
     list_filter = ('status', 'start_date', 'end_date')
+    list_select_related = ('organizer',)
+    autocomplete_fields = ('organizer',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # The totals read the annotations instead of aggregating per row.
+        return super().get_queryset(request).with_stats()
+
+    @admin.display(description='Total collected', ordering='paid_total')
+    def total_collected(self, obj):
+        return obj.total_collected
+
+    @admin.display(description='Active members', ordering='active_members_count')
+    def current_members_count(self, obj):
+        return obj.current_members_count
 
 
 admin.site.register(Committee, CommitteeAdmin)
@@ -17,6 +37,18 @@ class MembershipAdmin(admin.ModelAdmin):
     list_display = ('committee', 'member', 'status', 'joined_at', 'left_at', 'total_contributed', 'created_at', 'updated_at')
     search_fields = ('committee__name', 'member__email')
     list_filter = ('status', 'joined_at', 'left_at')
+    autocomplete_fields = ('committee', 'member')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Selected here rather than in list_select_related so the autocomplete
+        # results of the contribution and payout forms get them too.
+        return super().get_queryset(request).select_related('committee', 'member').with_totals()
+
+    @admin.display(description='Total contributed', ordering='paid_total')
+    def total_contributed(self, obj):
+        return obj.total_contributed
 
 
 admin.site.register(Membership, MembershipAdmin)
@@ -26,6 +58,10 @@ class ContributionAdmin(admin.ModelAdmin):
     list_display = ('membership', 'amount_paid', 'for_month', 'due_date', 'payment_date', 'payment_status', 'verified_by_organizer', 'created_at', 'updated_at')
     search_fields = ('membership__committee__name', 'membership__member__email')
     list_filter = ('payment_status', 'verified_by_organizer')
+    list_select_related = ('membership__member', 'membership__committee')
+    autocomplete_fields = ('membership',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(Contribution, ContributionAdmin)
@@ -35,6 +71,8 @@ class PayoutAdmin(admin.ModelAdmin):
     list_display = ('membership', 'total_amount', 'paid_at', 'received_by', 'is_confirmed', 'confirmed_at', 'received_in_cash', 'created_at', 'updated_at')
     search_fields = ('membership__committee__name', 'membership__member__email')
     list_filter = ('is_confirmed', 'received_in_cash')
+    list_select_related = ('membership__member', 'membership__committee', 'received_by')
+    autocomplete_fields = ('membership', 'received_by')
 
 
 admin.site.register(Payout, PayoutAdmin)
@@ -0,0 +1,185 @@
+"""
+Async versions of the read-heavy endpoints, for polling clients served by
+the ASGI application (``conf.asgi``).
+
+Each view mirrors its synchronous counterpart in ``views``: the same
+queryset (built by the sync view class, which is lazy and touches no
+database), the same serializer, pagination and conditional GET, and the
+same permission checks, run here on the async ORM. Authentication accepts
+JWT bearer tokens and sessions.
+
+Django's async ORM still runs each query on a worker thread; what these
+views save is the request thread held for the whole request, which matters
+when many clients poll at once. The ``load_test`` command measures the
+difference. ``CommitteeEventStreamView`` goes further and replaces polling
+with a server-sent event stream of the committee's changes.
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from account.authentication import CachedJWTAuthentication
+from conf.pagination import IdCursorPagination, JoinedAtCursorPagination
+from .access import ROLES, acommittee_access, amembership_access
+from .conditional import aconditional_response
+from .dashboard import abuild_dashboard
+from .events import format_event, get_broker, get_setting
+from .serializers import (
+    CommitteeSerializer, ContributionSerializer, DashboardCommitteeSerializer, MembershipSerializer
+)
+from .views import CommitteeView, ContributionListCreateView, MembershipListCreateView
+
+
+async def aauthenticate(request):
+    """Return the user of a JWT bearer token or of the session (possibly anonymous)."""
+    jwt = CachedJWTAuthentication()
+    header = jwt.get_header(request)
+    raw_token = jwt.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return await request.auser()
+    validated_token = jwt.get_validated_token(raw_token)
+    # A cache hit needs no thread.
+    return jwt.get_cached_user(validated_token) or await sync_to_async(jwt.get_user)(validated_token)
+
+
+class AsyncReadView(View):
+    """Base class: authenticates, enforces IsAuthenticated and maps errors like DRF does."""
+    http_method_names = ['get']
+    requires_authentication = True
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            user = await aauthenticate(request)
+            if self.requires_authentication and not user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            self.drf_request = Request(request)
+            self.drf_request.user = user
+            self.user = user
+            return await self.respond(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+            if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(request)
+            return response
+        except Http404:
+            return JsonResponse({'detail': 'No matching object found.'}, status=404)
+
+    async def respond(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def sync_view(self, view_class, **attrs):
+        """An instance of the sync view, used only to build its queryset."""
+        view = view_class(request=self.drf_request, args=self.args, kwargs=self.kwargs, format_kwarg=None)
+        for name, value in attrs.items():
+            setattr(view, name, value)
+        return view
+
+    def serializer_context(self):
+        return {'request': self.drf_request, 'view': self}
+
+    async def paginated(self, paginator, queryset, serializer_class):
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, self.drf_request)
+        data = serializer_class(page, many=True, context=self.serializer_context()).data
+        return self.json(paginator.get_paginated_response(data).data)
+
+    def json(self, data, status=200):
+        # DRF's encoder, so values serialize exactly as on the sync views.
+        return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+class AsyncCommitteeView(AsyncReadView):
+    # IsOrganizer: anyone may read committees.
+    requires_authentication = False
+
+    async def respond(self, request, *args, **kwargs):
+        view = self.sync_view(CommitteeView)
+        queryset = view.get_queryset()
+        committee_id = self.kwargs.get('id')
+        if committee_id is None:
+            page_ids = await sync_to_async(view.page_ids)(self.drf_request)
+            return await aconditional_response(
+                request, page_ids, lambda: self.paginated(IdCursorPagination(), queryset, CommitteeSerializer)
+            )
+
+        async def retrieve():
+            committee = await queryset.filter(id=committee_id).afirst()
+            if committee is None:
+                raise Http404
+            return self.json(CommitteeSerializer(committee, context=self.serializer_context()).data)
+
+        return await aconditional_response(request, [committee_id], retrieve)
+
+
+class AsyncMembershipListView(AsyncReadView):
+    async def respond(self, request, *args, **kwargs):
+        access = await acommittee_access(self.drf_request, self.kwargs['committee_id'])
+        access.require(*ROLES, message="You don't have permission to view members of this committee.")
+        # The sync view finds the access memoized on the request.
+        queryset = self.sync_view(MembershipListCreateView).get_queryset()
+        return await aconditional_response(
+            request, [access.committee.id],
+            lambda: self.paginated(JoinedAtCursorPagination(), queryset, MembershipSerializer),
+        )
+
+
+class AsyncContributionListView(AsyncReadView):
+    async def respond(self, request, *args, **kwargs):
+        access = await amembership_access(self.drf_request, self.kwargs['membership_id'])
+        queryset = self.sync_view(ContributionListCreateView).get_queryset()
+        paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+        return await aconditional_response(
+            request, [access.committee.id],
+            lambda: self.paginated(paginator, queryset, ContributionSerializer),
+        )
+
+
+class AsyncDashboardView(AsyncReadView):
+    async def respond(self, request, *args, **kwargs):
+        committees = await abuild_dashboard(self.user)
+        serializer = DashboardCommitteeSerializer(committees, many=True, context=self.serializer_context())
+        return self.json({'committees': serializer.data})
+
+
+class CommitteeEventStreamView(AsyncReadView):
+    """
+    ``text/event-stream`` of the committee's ``contribution``, ``payout`` and
+    ``ledger`` events (see ``events``) for its organizer and members. Serve
+    it from the ASGI application: each open stream holds a worker thread
+    under WSGI.
+    """
+
+    async def respond(self, request, *args, **kwargs):
+        access = await acommittee_access(self.drf_request, self.kwargs['committee_id'])
+        access.require(*ROLES, message="You don't have permission to follow this committee.")
+        # Members only see the events about their own membership.
+        membership_id = None if access.is_organizer else access.viewer_membership_id
+        response = StreamingHttpResponse(
+            self.stream(access.committee.id, membership_id), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, committee_id, membership_id=None):
+        broker = get_broker()
+        subscription = broker.subscribe(committee_id, membership_id)
+        keepalive = get_setting('KEEPALIVE_SECONDS')
+        deadline = time.monotonic() + get_setting('MAX_STREAM_SECONDS')
+        try:
+            yield 'retry: 3000\n\n'
+            while time.monotonic() < deadline:
+                event = await subscription.get(min(keepalive, max(0, deadline - time.monotonic())))
+                if subscription.overflowed:
+                    yield format_event({'type': 'reset', 'data': {}})
+                    break
+                yield format_event(event) if event else ': keepalive\n\n'
+        finally:
+            # Also reached when the client disconnects and the stream is cancelled.
+            broker.unsubscribe(subscription)
@@ -0,0 +1,435 @@
+"""
+Query-count, latency and memory benchmarks for every API route.
+
+``seed()`` bulk-loads a synthetic dataset, ``build_routes()`` maps every
+named route in ``committee.urls`` and ``account.urls`` to a request against
+that dataset, and ``run()`` replays them through the test client. The
+``benchmark_api`` management command wraps these in a throwaway test
+database and compares the results against a stored baseline.
+"""
+import base64
+import io
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import count
+
+from asgiref.sync import async_to_sync
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from account.authentication import CachedJWTAuthentication, UserRefreshToken, user_cache
+from account.hashers import get_setting as get_hashing_setting
+from account.models import User
+from account.views import UserProfileView
+from .cache import get_cache
+from .importer import import_committee_csv
+from .ledger import refresh_membership_ledgers
+from .models import Committee, Contribution, Membership, Payout
+
+PASSWORD = 'benchmark-pass-123'
+MONTHLY_AMOUNT = Decimal('100.00')
+START_DATE = date(2024, 1, 1)
+BATCH_SIZE = 2000
+
+
+@dataclass
+class Route:
+    name: str
+    method: str
+    path: str
+    user: object
+    data: object = None
+    # Called before each request to build per-iteration payloads.
+    prepare: object = None
+    format: str = 'json'
+    # Settings overridden for the request.
+    settings: dict = None
+
+
+def seed(users=200, committees=20, contributions=5000):
+    """Bulk-load a synthetic dataset and return the number of rows created per model."""
+    password = make_password(PASSWORD)
+    organizers = max(1, committees // 5)
+    User.objects.bulk_create(
+        [
+            User(
+                email=f'bench{i}@example.com', first_name='Bench', last_name=str(i), password=password,
+                is_organizer=i < organizers, is_active=True, is_verified=True, is_approved=True,
+            )
+            for i in range(users)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    User.objects.create(email='bench-admin@example.com', password=password, is_staff=True, is_superuser=True)
+    user_ids = list(User.objects.filter(email__startswith='bench', is_staff=False).order_by('id').values_list('id', flat=True))
+
+    members_per_committee = max(1, len(user_ids) // committees)
+    months = max(1, -(-contributions // (committees * members_per_committee)))
+    Committee.objects.bulk_create(
+        [
+            Committee(
+                name=f'Benchmark committee {c}', description='Synthetic benchmark data',
+                monthly_amount=MONTHLY_AMOUNT, duration_months=months, organizer_id=user_ids[c % organizers],
+                start_date=START_DATE, end_date=START_DATE + relativedelta(months=months),
+            )
+            for c in range(committees)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    committee_ids = list(Committee.objects.order_by('id').values_list('id', flat=True))
+
+    Membership.objects.bulk_create(
+        [
+            Membership(committee_id=committee_id, member_id=user_ids[(c * members_per_committee + m) % len(user_ids)])
+            for c, committee_id in enumerate(committee_ids)
+            for m in range(members_per_committee)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    first_membership = {}
+    membership_ids = []
+    for membership_id, committee_id in Membership.objects.order_by('id').values_list('id', 'committee_id'):
+        first_membership.setdefault(committee_id, membership_id)
+        membership_ids.append(membership_id)
+
+    created, batch = 0, []
+    for membership_id in membership_ids:
+        for month in range(months):
+            if created >= contributions:
+                break
+            for_month = START_DATE + relativedelta(months=month)
+            batch.append(Contribution(
+                membership_id=membership_id, amount_paid=MONTHLY_AMOUNT, for_month=for_month,
+                due_date=for_month + timedelta(days=9), payment_date=for_month + timedelta(days=5),
+                payment_status='PAID', verified_by_organizer=month % 2 == 0,
+            ))
+            created += 1
+            if len(batch) >= BATCH_SIZE:
+                Contribution.objects.bulk_create(batch)
+                batch = []
+    Contribution.objects.bulk_create(batch)
+
+    Payout.objects.bulk_create([
+        Payout(membership_id=membership_id, total_amount=MONTHLY_AMOUNT)
+        for membership_id in first_membership.values()
+    ])
+
+    for start in range(0, len(membership_ids), BATCH_SIZE):
+        refresh_membership_ledgers(membership_ids[start:start + BATCH_SIZE])
+
+    return {
+        'users': users, 'committees': committees,
+        'memberships': len(membership_ids), 'contributions': created,
+    }
+
+
+def build_routes():
+    """Return one Route per named URL in the committee and account apps."""
+    committee = Committee.objects.order_by('id').first()
+    organizer = committee.organizer
+    membership = committee.memberships.order_by('id').first()
+    contribution = membership.contributions.order_by('id').first()
+    payout = Payout.objects.filter(membership__committee=committee).first()
+    member = membership.member
+    admin = User.objects.get(email='bench-admin@example.com')
+    signups = count()
+
+    def import_payload(route):
+        route.data = {'file': SimpleUploadedFile('members.csv', import_file(
+            committee.memberships.count(), committee.duration_months, committee.start_date,
+        ))}
+
+    def signup_payload(route):
+        route.data = {
+            'first_name': 'New', 'last_name': 'User', 'phone': '',
+            'email': f'bench-signup-{next(signups)}@example.com', 'password': PASSWORD,
+        }
+
+    return [
+        Route('dashboard', 'get', reverse('dashboard'), organizer),
+        Route('cache-stats', 'get', reverse('cache-stats'), admin),
+        Route('committee-list-create', 'get', reverse('committee-list-create'), organizer),
+        Route('committee-detail', 'get', reverse('committee-detail', args=[committee.id]), organizer),
+        Route('membership-list-create', 'get', reverse('membership-list-create', args=[committee.id]), organizer),
+        Route('membership-detail', 'get', reverse('membership-detail', args=[committee.id, membership.id]), organizer),
+        Route('contribution-list-create', 'get', reverse('contribution-list-create', args=[membership.id]), member),
+        Route('contribution-detail', 'get',
+              reverse('contribution-detail', args=[membership.id, contribution.id]), member),
+        Route('contribution-bulk-create', 'post', reverse('contribution-bulk-create', args=[committee.id]), organizer, {
+            'for_month': contribution.for_month.isoformat(),
+            'due_date': contribution.due_date.isoformat(),
+            'contributions': [
+                {'membership': m_id, 'amount_paid': str(MONTHLY_AMOUNT),
+                 'payment_date': contribution.payment_date.isoformat()}
+                for m_id in committee.memberships.values_list('id', flat=True)
+            ],
+        }),
+        Route('contribution-bulk-verify', 'patch', reverse('contribution-bulk-verify'), organizer,
+              {'committee': committee.id, 'for_month': contribution.for_month.isoformat()}),
+        Route('contribution-verify', 'patch', reverse('contribution-verify', args=[contribution.id]), organizer),
+        Route('payout-list-create', 'get', reverse('payout-list-create', args=[committee.id]), organizer),
+        Route('payout-detail', 'get', reverse('payout-detail', args=[payout.id]), organizer),
+        Route('payout-confirm', 'patch', reverse('payout-confirm', args=[payout.id]), organizer),
+        Route('ledger-export', 'get', reverse('ledger-export'), organizer),
+        Route('committee-ledger-export', 'get', reverse('committee-ledger-export', args=[committee.id]), organizer),
+        Route('committee-import', 'post', reverse('committee-import', args=[committee.id]), organizer,
+              prepare=import_payload, format='multipart'),
+        Route('committee-jobs', 'post', reverse('committee-jobs', args=[committee.id]), organizer,
+              {'task': 'schedule'}),
+        Route('async-dashboard', 'get', reverse('async-dashboard'), organizer),
+        Route('async-committee-list', 'get', reverse('async-committee-list'), organizer),
+        Route('async-committee-detail', 'get', reverse('async-committee-detail', args=[committee.id]), organizer),
+        Route('async-membership-list', 'get', reverse('async-membership-list', args=[committee.id]), organizer),
+        Route('async-contribution-list', 'get', reverse('async-contribution-list', args=[membership.id]), member),
+        # Opening the stream only: authentication, permission check and subscription.
+        Route('committee-events', 'get', reverse('committee-events', args=[committee.id]), member,
+              settings={'COMMITTEE_EVENTS': {'MAX_STREAM_SECONDS': 0}}),
+        Route('signup', 'post', reverse('signup'), None, prepare=signup_payload),
+        Route('login', 'post', reverse('login'), None, {'email': member.email, 'password': PASSWORD}),
+        Route('profile', 'get', reverse('profile'), member),
+        Route('change-password', 'put', reverse('change-password'), member,
+              {'old_password': PASSWORD, 'new_password': PASSWORD}),
+    ]
+
+
+def import_file(members, months, start=START_DATE):
+    """Return CSV bytes with ``months`` paid contributions for each of ``members`` members."""
+    lines = ['email,first_name,last_name,for_month,amount_paid,payment_date']
+    for m in range(members):
+        for month in range(months):
+            for_month = start + relativedelta(months=month)
+            lines.append(f'bench{m}@example.com,Bench,{m},{for_month},{MONTHLY_AMOUNT},{for_month}')
+    return ('\n'.join(lines) + '\n').encode()
+
+
+def import_throughput(rows=5000, members=100):
+    """Time a CSV import of ``rows`` contributions into a fresh committee."""
+    months = max(1, rows // members)
+    committee = Committee.objects.create(
+        name='Benchmark import', description='Synthetic import benchmark', monthly_amount=MONTHLY_AMOUNT,
+        duration_months=months, organizer=User.objects.get(email='bench-admin@example.com'),
+        start_date=START_DATE,
+    )
+    upload = io.BytesIO(import_file(members, months))
+    with CaptureQueriesContext(connection) as captured:
+        start = time.perf_counter()
+        report = import_committee_csv(committee, upload)
+        seconds = time.perf_counter() - start
+    return {
+        'rows': report['rows'],
+        'errors': report['error_count'],
+        'queries': len(captured),
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(report['rows'] / seconds),
+    }
+
+
+def write_throughput(threads=8, writes=400):
+    """
+    Run ``writes`` contribution updates from ``threads`` threads at once,
+    each a read-then-write transaction like a payment being recorded, and
+    return writes/second and how many failed (e.g. "database is locked").
+    """
+    contribution_ids = list(Contribution.objects.order_by('id').values_list('id', flat=True)[:writes])
+
+    def worker(ids):
+        done, failed = 0, []
+        try:
+            for contribution_id in ids:
+                try:
+                    with transaction.atomic():
+                        contribution = Contribution.objects.get(id=contribution_id)
+                        contribution.verified_by_organizer = not contribution.verified_by_organizer
+                        contribution.save()
+                    done += 1
+                except OperationalError as exc:
+                    failed.append(str(exc))
+        finally:
+            connection.close()
+        return done, failed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(worker, [contribution_ids[i::threads] for i in range(threads)]))
+    seconds = time.perf_counter() - start
+
+    done = sum(result[0] for result in results)
+    errors = [error for result in results for error in result[1]]
+    return {
+        'threads': threads,
+        'writes': done,
+        'failed': len(errors),
+        'errors': sorted(set(errors)),
+        'seconds': round(seconds, 3),
+        'writes_per_second': round(done / seconds, 1),
+    }
+
+
+def auth_throughput(requests=200):
+    """
+    Requests/second and queries per request of the profile endpoint under
+    each authentication class. Basic authentication hashes the password on
+    every request, so it gets a twentieth of the requests.
+    """
+    user = User.objects.filter(email__startswith='bench', is_staff=False).order_by('id').first()
+    basic = 'Basic ' + base64.b64encode(f'{user.email}:{PASSWORD}'.encode()).decode()
+    bearer = f'Bearer {UserRefreshToken.for_user(user).access_token}'
+    cases = {
+        'basic': (BasicAuthentication, basic, max(1, requests // 20)),
+        'jwt': (JWTAuthentication, bearer, requests),
+        'cached-jwt': (CachedJWTAuthentication, bearer, requests),
+    }
+
+    factory = APIRequestFactory()
+    results = {}
+    for name, (authentication, header, total) in cases.items():
+        view = UserProfileView.as_view(authentication_classes=[authentication])
+        user_cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            for _ in range(total):
+                response = view(factory.get(reverse('profile'), HTTP_AUTHORIZATION=header))
+                response.render()
+            seconds = time.perf_counter() - start
+        results[name] = {
+            'status': response.status_code,
+            'requests': total,
+            'requests_per_second': round(total / seconds, 1),
+            'queries_per_request': round(len(captured) / total, 2),
+        }
+    return results
+
+
+def login_throughput(requests=20):
+    """
+    Logins/second with Django's default PBKDF2 cost and with the configured
+    one. The first login of each run re-hashes the stored password to that
+    cost and is not timed.
+    """
+    user = User.objects.filter(email__startswith='bench', is_staff=False).order_by('id').first()
+    client = APIClient()
+    payload = {'email': user.email.upper(), 'password': PASSWORD}
+    results = {}
+    for name, iterations in (
+        ('django-default', hashers.PBKDF2PasswordHasher.iterations),
+        ('configured', get_hashing_setting('PBKDF2_ITERATIONS')),
+    ):
+        with override_settings(PASSWORD_HASHING={'PBKDF2_ITERATIONS': iterations}):
+            client.post(reverse('login'), payload, format='json')
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                for _ in range(requests):
+                    response = client.post(reverse('login'), payload, format='json')
+                seconds = time.perf_counter() - start
+        results[name] = {
+            'iterations': iterations,
+            'status': response.status_code,
+            'requests': requests,
+            'logins_per_second': round(requests / seconds, 1),
+            'queries_per_login': round(len(captured) / requests, 2),
+        }
+    return results
+
+
+_tokens = {}
+
+
+def _access_token(user):
+    if user.id not in _tokens:
+        _tokens[user.id] = str(UserRefreshToken.for_user(user).access_token)
+    return _tokens[user.id]
+
+
+async def _drain(chunks):
+    async for _ in chunks:
+        pass
+
+
+def _request(client, route):
+    if route.prepare:
+        route.prepare(route)
+    client.force_authenticate(route.user)
+    # The async views authenticate on their own, from the bearer token.
+    client.credentials(**({'HTTP_AUTHORIZATION': f'Bearer {_access_token(route.user)}'} if route.user else {}))
+    # Measure the real work, not the committee payload cache.
+    get_cache().clear()
+    with override_settings(**(route.settings or {})):
+        response = getattr(client, route.method)(route.path, route.data, format=route.format)
+        if response.streaming:
+            # Streamed bodies are produced (and queried) while being consumed.
+            if response.is_async:
+                async_to_sync(_drain)(response.streaming_content)
+            else:
+                b''.join(response.streaming_content)
+    return response
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run(routes, iterations=10):
+    """Replay every route and return ``{name: metrics}``."""
+    client = APIClient()
+    results = {}
+    for route in routes:
+        timings, queries, statuses = [], [], set()
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = _request(client, route)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(captured))
+            statuses.add(response.status_code)
+
+        # One extra traced request: tracemalloc slows everything it watches.
+        tracemalloc.start()
+        _request(client, route)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[route.name] = {
+            'method': route.method.upper(),
+            'path': route.path,
+            'status': sorted(statuses),
+            'queries': max(queries),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(_percentile(timings, 95), 3),
+            'peak_kb': round(peak / 1024, 1),
+        }
+    return results
+
+
+def compare(results, baseline, threshold=0.25, min_delta_ms=2.0):
+    """
+    Return a list of regressions of ``results`` against ``baseline``: any
+    increase in query count, or a p95 latency above the baseline by more
+    than ``threshold`` (a fraction) and ``min_delta_ms``.
+    """
+    regressions = []
+    for name, before in baseline.items():
+        after = results.get(name)
+        if after is None:
+            regressions.append(f"{name}: missing from this run")
+            continue
+        if after['queries'] > before['queries']:
+            regressions.append(f"{name}: queries {before['queries']} -> {after['queries']}")
+        limit = before['p95_ms'] * (1 + threshold)
+        if after['p95_ms'] > limit and after['p95_ms'] - before['p95_ms'] > min_delta_ms:
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {after['p95_ms']}ms")
+    return regressions
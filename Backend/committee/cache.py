@@ -0,0 +1,89 @@
+"""
+Read-through cache for serialized committee payloads.
+
+Entries live in the Django cache named by ``COMMITTEE_CACHE_ALIAS`` (a
+local-memory LRU with a TTL by default, see ``CACHES`` in settings) and are
+keyed by committee, payload kind, viewer scope and request path. Every key
+embeds a per-committee generation token, so invalidating a committee is a
+single write that orphans all of its entries on any backend.
+
+Payloads read from a replica may predate an invalidation the replica has
+not replayed yet, so they are kept for ``COMMITTEE_CACHE_REPLICA_TIMEOUT``
+seconds only; that bounds how long a lagging replica's rows are served.
+"""
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+
+from conf.routers import replica_reads_active
+
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'COMMITTEE_CACHE_ALIAS', 'default')]
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _generation(cache, committee_id):
+    key = f'committee:{committee_id}:generation'
+    generation = cache.get(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.set(key, generation, None)
+    return generation
+
+
+def invalidate_committees(committee_ids):
+    """Drop every cached payload of the given committees, now and again on commit."""
+    committee_ids = {committee_id for committee_id in committee_ids if committee_id}
+    if not committee_ids:
+        return
+
+    def invalidate():
+        cache = get_cache()
+        cache.set_many(
+            {f'committee:{committee_id}:generation': uuid.uuid4().hex for committee_id in committee_ids},
+            None,
+        )
+        _count('invalidations')
+
+    invalidate()
+    # A reader may re-cache the old rows before this transaction commits.
+    transaction.on_commit(invalidate)
+
+
+def cached_payload(committee_id, kind, scope, request, build):
+    """
+    Return ``(data, hit)`` for the payload identified by the arguments,
+    calling ``build()`` on a miss. ``build`` returns ``(data, cacheable)``.
+    """
+    cache = get_cache()
+    key = f'committee:{committee_id}:{_generation(cache, committee_id)}:{kind}:{scope}:{request.get_full_path()}'
+    data = cache.get(key)
+    if data is not None:
+        _count('hits')
+        return data, True
+
+    _count('misses')
+    data, cacheable = build()
+    if cacheable:
+        timeout = DEFAULT_TIMEOUT
+        if replica_reads_active():
+            timeout = getattr(settings, 'COMMITTEE_CACHE_REPLICA_TIMEOUT', 5)
+        cache.set(key, data, timeout)
+    return data, False
@@ -0,0 +1,78 @@
+"""
+Conditional GET support for committee resources.
+
+A committee's version is the newest ``updated_at`` and the row count of the
+committee, its memberships, their contributions and their payouts, read in
+one aggregate query over the given committees only; lists pass the ids of
+the committees on the requested page. The counts catch deletes, which do
+not move any ``updated_at``. ``If-None-Match`` is answered with a 304 before
+any serializer work happens.
+
+There is deliberately no Last-Modified: it has one-second precision and
+deletes do not move it, so ``If-Modified-Since`` could be answered with a
+304 for changed data.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+
+from .models import Committee
+
+VERSION_AGGREGATES = {
+    'committee_latest': Max('updated_at'),
+    'committee_count': Count('id', distinct=True),
+    'membership_latest': Max('memberships__updated_at'),
+    'membership_count': Count('memberships', distinct=True),
+    'contribution_latest': Max('memberships__contributions__updated_at'),
+    'contribution_count': Count('memberships__contributions', distinct=True),
+    'payout_latest': Max('memberships__payouts__updated_at'),
+    'payout_count': Count('memberships__payouts', distinct=True),
+}
+
+
+def committee_version(committee_ids):
+    """Return the version aggregates of the given committees."""
+    return Committee.objects.order_by().filter(id__in=committee_ids).aggregate(**VERSION_AGGREGATES)
+
+
+async def acommittee_version(committee_ids):
+    """``committee_version`` on the async ORM."""
+    return await Committee.objects.order_by().filter(id__in=committee_ids).aaggregate(**VERSION_AGGREGATES)
+
+
+def _etag(request, committee_ids, version):
+    # The ids matter too: a list page changes when a committee joins or leaves it.
+    fingerprint = '|'.join(
+        [request.get_full_path(), ','.join(map(str, committee_ids))] +
+        [str(version[key]) for key in VERSION_AGGREGATES]
+    )
+    return '"%s"' % hashlib.sha1(fingerprint.encode()).hexdigest()
+
+
+def _set_etag(response, etag):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+    return response
+
+
+def conditional_response(request, committee_ids, build_response):
+    """
+    Answer a GET for a resource derived from ``committee_ids`` with a 304 when
+    the client's ETag still matches; otherwise call ``build_response()`` and
+    attach a strong ETag to it.
+    """
+    etag = _etag(request, committee_ids, committee_version(committee_ids))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = build_response()
+    return _set_etag(response, etag)
+
+
+async def aconditional_response(request, committee_ids, build_response):
+    """``conditional_response`` for async views; ``build_response`` is a coroutine function."""
+    etag = _etag(request, committee_ids, await acommittee_version(committee_ids))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = await build_response()
+    return _set_etag(response, etag)
@@ -0,0 +1,112 @@
+"""
+Per-user dashboard summary, computed with grouped aggregates in a fixed
+number of queries regardless of how many committees, members or
+contributions are involved. ``abuild_dashboard`` runs the same queries on
+the async ORM.
+"""
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from .models import Committee, Contribution, Membership
+
+ZERO = Decimal('0.00')
+
+
+def _committees_query(user):
+    next_payout = Membership.objects.filter(
+        committee=OuterRef('pk'), status='ACTIVE', payouts__isnull=True
+    ).order_by('joined_at', 'id').values('id')[:1]
+
+    return Committee.objects.filter(
+        Q(organizer=user) |
+        Q(id__in=Membership.objects.filter(member=user, status='ACTIVE').values('committee_id'))
+    ).annotate(
+        next_payout_id=Subquery(next_payout, output_field=models.BigIntegerField())
+    ).order_by('-id')
+
+
+def _totals_query(committee_ids, overdue):
+    return Contribution.objects.filter(
+        membership__committee_id__in=committee_ids
+    ).order_by().values('membership__committee_id').annotate(
+        collected=Sum('amount_paid', filter=Q(payment_status='PAID')),
+        outstanding=Sum('amount_paid', filter=overdue),
+        late_count=Count('id', filter=Q(payment_status='LATE')),
+        paid_count=Count('id', filter=Q(payment_date__isnull=False)),
+        verified_count=Count('id', filter=Q(payment_date__isnull=False, verified_by_organizer=True)),
+    )
+
+
+def _behind_query(user, committee_ids, overdue):
+    # Organizers see everyone who is behind; members only see themselves.
+    return Contribution.objects.filter(overdue, membership__committee_id__in=committee_ids).filter(
+        Q(membership__committee__organizer=user) | Q(membership__member=user)
+    ).order_by().values(
+        'membership_id', 'membership__committee_id', 'membership__member_id',
+        'membership__member__first_name', 'membership__member__last_name',
+    ).annotate(months_behind=Count('id'), amount_due=Sum('amount_paid')).order_by('membership_id')
+
+
+def build_dashboard(user, today=None):
+    overdue = Q(payment_date__isnull=True, due_date__lte=today or timezone.localdate())
+    committees = list(_committees_query(user))
+    committee_ids = [c.id for c in committees]
+    totals = list(_totals_query(committee_ids, overdue))
+    behind = list(_behind_query(user, committee_ids, overdue))
+    candidates = Membership.objects.select_related('member').in_bulk(
+        [c.next_payout_id for c in committees if c.next_payout_id]
+    )
+    return _assemble(user, committees, totals, behind, candidates)
+
+
+async def abuild_dashboard(user, today=None):
+    """``build_dashboard`` on the async ORM: the same four queries."""
+    overdue = Q(payment_date__isnull=True, due_date__lte=today or timezone.localdate())
+    committees = [c async for c in _committees_query(user)]
+    committee_ids = [c.id for c in committees]
+    totals = [row async for row in _totals_query(committee_ids, overdue)]
+    behind = [row async for row in _behind_query(user, committee_ids, overdue)]
+    candidates = await Membership.objects.select_related('member').ain_bulk(
+        [c.next_payout_id for c in committees if c.next_payout_id]
+    )
+    return _assemble(user, committees, totals, behind, candidates)
+
+
+def _assemble(user, committees, total_rows, behind_rows, candidates):
+    totals = {row.pop('membership__committee_id'): row for row in total_rows}
+
+    behind = {}
+    for row in behind_rows:
+        behind.setdefault(row['membership__committee_id'], []).append({
+            'membership_id': row['membership_id'],
+            'member_id': row['membership__member_id'],
+            'member_name': f"{row['membership__member__first_name']} {row['membership__member__last_name']}",
+            'months_behind': row['months_behind'],
+            'amount_due': row['amount_due'],
+        })
+
+    results = []
+    for committee in committees:
+        row = totals.get(committee.id, {})
+        paid_count = row.get('paid_count', 0)
+        candidate = candidates.get(committee.next_payout_id)
+        results.append({
+            'id': committee.id,
+            'name': committee.name,
+            'status': committee.status,
+            'role': 'organizer' if committee.organizer_id == user.id else 'member',
+            'collected': row.get('collected') or ZERO,
+            'outstanding': row.get('outstanding') or ZERO,
+            'late_count': row.get('late_count', 0),
+            'verified_ratio': round(row.get('verified_count', 0) / paid_count, 4) if paid_count else None,
+            'next_payout_candidate': {
+                'membership_id': candidate.id,
+                'member_id': candidate.member_id,
+                'member_name': candidate.member.full_name,
+            } if candidate else None,
+            'members_behind': behind.get(committee.id, []),
+        })
+    return results
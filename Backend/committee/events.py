@@ -0,0 +1,215 @@
+"""
+Live change events for committees, streamed to clients as server-sent events.
+
+Writes publish small JSON events on commit: ``contribution`` and ``payout``
+when a row is saved or deleted (or verified in bulk), and ``ledger`` with the
+recomputed totals of every membership whose ledger was refreshed, which
+covers the bulk write paths too. A broker fans events out to the open
+streams of the committee. ``LocalBroker`` only reaches streams in this
+process; ``RedisBroker`` relays events through Redis pub/sub so every ASGI
+worker sees every write. Pick one with ``COMMITTEE_EVENTS['BACKEND']``.
+
+Streams see what the REST endpoints would show them. The organizer's stream
+gets every event; a member's stream only gets the part of each event that
+concerns their own membership (``members``), and nothing about the others.
+
+A stream whose client falls ``QUEUE_SIZE`` events behind is sent a ``reset``
+event and should refetch instead of trusting its incremental state.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+DEFAULTS = {
+    'BACKEND': 'committee.events.LocalBroker',
+    'REDIS_URL': 'redis://localhost:6379/0',
+    'REDIS_CHANNEL': 'committee-events',
+    'QUEUE_SIZE': 100,
+    'KEEPALIVE_SECONDS': 15,
+    # Streams end after this long; EventSource reconnects (and re-authenticates).
+    'MAX_STREAM_SECONDS': 300,
+}
+
+CONTRIBUTION_FIELDS = ['id', 'membership_id', 'for_month', 'due_date', 'payment_date', 'payment_status',
+                       'verified_by_organizer']
+PAYOUT_FIELDS = ['id', 'membership_id', 'total_amount', 'is_confirmed', 'confirmed_at', 'received_in_cash']
+
+_broker = None
+
+
+def get_setting(name):
+    return getattr(settings, 'COMMITTEE_EVENTS', {}).get(name, DEFAULTS[name])
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(get_setting('BACKEND'))()
+    return _broker
+
+
+class Subscription:
+    """
+    One open stream: a bounded queue filled from any thread, read on its
+    event loop. ``membership_id`` limits it to that member's view of each
+    event; None (the organizer) receives events whole.
+    """
+
+    def __init__(self, committee_id, size, membership_id=None):
+        self.committee_id = committee_id
+        self.membership_id = membership_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(size)
+        self.overflowed = False
+
+    def view(self, event):
+        """Return the event as this stream may see it, or None."""
+        members = event.get('members')
+        if members is None or self.membership_id is None:
+            return {'type': event['type'], 'data': event['data']}
+        # Keys went through JSON, so they are strings.
+        data = members.get(str(self.membership_id))
+        if data is None:
+            return None
+        return {'type': event['type'], 'data': data}
+
+    def put(self, event):
+        event = self.view(event)
+        if event is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Return the next event, or None when ``timeout`` seconds pass without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalBroker:
+    """Delivers events to the subscribers of this process."""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, committee_id, membership_id=None):
+        subscription = Subscription(committee_id, get_setting('QUEUE_SIZE'), membership_id)
+        with self.lock:
+            self.subscribers[committee_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.committee_id, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self.subscribers.pop(subscription.committee_id, None)
+
+    def active(self):
+        """False when no stream could receive an event, so publishing can be skipped."""
+        return bool(self.subscribers)
+
+    def publish(self, committee_id, event):
+        self.deliver(committee_id, event)
+
+    def deliver(self, committee_id, event):
+        with self.lock:
+            subscribers = list(self.subscribers.get(committee_id, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+class RedisBroker(LocalBroker):
+    """
+    Publishes to a Redis channel; one listener thread per process delivers
+    what it hears to the local subscribers.
+    """
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("committee.events.RedisBroker requires the redis package.")
+        self.client = redis.Redis.from_url(get_setting('REDIS_URL'))
+        self.channel = get_setting('REDIS_CHANNEL')
+        self.listener = None
+
+    def active(self):
+        # Other processes may have subscribers.
+        return True
+
+    def subscribe(self, committee_id, membership_id=None):
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name='committee-events', daemon=True)
+                self.listener.start()
+        return super().subscribe(committee_id, membership_id)
+
+    def publish(self, committee_id, event):
+        self.client.publish(self.channel, json.dumps([committee_id, event]))
+
+    def listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        for message in pubsub.listen():
+            committee_id, event = json.loads(message['data'])
+            self.deliver(committee_id, event)
+
+
+def _event(event_type, data, members=None):
+    # Plain JSON types, so every broker can pass the event on as it is.
+    event = {'type': event_type, 'data': data}
+    if members is not None:
+        event['members'] = members
+    return json.loads(json.dumps(event, cls=DjangoJSONEncoder))
+
+
+def publish(committee_id, event_type, data, members=None):
+    """
+    Publish an event to the committee's streams once the current transaction
+    commits. ``members`` maps membership ids to the data that member may
+    see; members left out receive nothing. Without it, every stream gets
+    ``data``.
+    """
+    event = _event(event_type, data, members)
+
+    def send():
+        if get_broker().active():
+            get_broker().publish(committee_id, event)
+
+    transaction.on_commit(send)
+
+
+def publish_row(instance, fields, action):
+    """Publish the ``action`` of a Contribution or Payout row."""
+    data = {field: getattr(instance, field) for field in fields}
+    data['action'] = action
+    # Only the organizer and the row's own member see it.
+    event = _event(type(instance).__name__.lower(), data, {instance.membership_id: data})
+
+    def send():
+        # Resolved after commit; the membership is usually cached already.
+        if get_broker().active():
+            get_broker().publish(instance.membership.committee_id, event)
+
+    transaction.on_commit(send)
+
+
+def format_event(event):
+    """Encode an event in the text/event-stream format."""
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
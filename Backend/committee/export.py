@@ -0,0 +1,79 @@
+"""
+Streaming ledger export.
+
+Every contribution and payout of a set of committees is read with
+``.iterator(chunk_size=...)`` (a server-side cursor on PostgreSQL, chunked
+fetches elsewhere) as flat ``values_list`` rows joined to their membership,
+member and committee, and encoded one line at a time as CSV or JSONL. Nothing
+is materialised, so memory stays flat however large the committee is.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Contribution, Payout
+
+CHUNK_SIZE = 2000
+
+COLUMNS = [
+    'record_type', 'record_id', 'committee_id', 'committee_name', 'membership_id',
+    'member_id', 'member_email', 'member_first_name', 'member_last_name',
+    'amount', 'for_month', 'due_date', 'paid_on', 'status', 'verified',
+]
+
+MEMBERSHIP_COLUMNS = [
+    'membership__committee_id', 'membership__committee__name', 'membership_id',
+    'membership__member_id', 'membership__member__email',
+    'membership__member__first_name', 'membership__member__last_name',
+]
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def export_rows(committee_ids):
+    """Yield one tuple per contribution, then per payout, in ``COLUMNS`` order."""
+    contributions = Contribution.objects.filter(
+        membership__committee_id__in=committee_ids
+    ).order_by('membership__committee_id', 'id').values_list(
+        'id', *MEMBERSHIP_COLUMNS, 'amount_paid', 'for_month', 'due_date',
+        'payment_date', 'payment_status', 'verified_by_organizer',
+    )
+    for row in contributions.iterator(chunk_size=CHUNK_SIZE):
+        yield ('contribution',) + row
+
+    payouts = Payout.objects.filter(
+        membership__committee_id__in=committee_ids
+    ).order_by('membership__committee_id', 'id').values_list(
+        'id', *MEMBERSHIP_COLUMNS, 'total_amount', 'paid_at', 'is_confirmed',
+    )
+    for *row, total_amount, paid_at, is_confirmed in payouts.iterator(chunk_size=CHUNK_SIZE):
+        yield ('payout', *row, total_amount, None, None, paid_at,
+               'CONFIRMED' if is_confirmed else 'UNCONFIRMED', is_confirmed)
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_jsonl(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(COLUMNS, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_export(committee_ids, file_format):
+    rows = export_rows(committee_ids)
+    return stream_csv(rows) if file_format == 'csv' else stream_jsonl(rows)
@@ -0,0 +1,231 @@
+"""
+CSV import of members and their historical contributions.
+
+The upload is read one line at a time with ``csv.DictReader``. Each row names
+a member by ``email`` (plus optional ``first_name``, ``last_name`` and
+``phone``) and may record one contribution (``for_month``, ``amount_paid``,
+``payment_date``, ``due_date``). Valid rows are written in batches: users are
+resolved by email with one query and the missing ones bulk-created, then the
+missing memberships, then the contributions are upserted on
+(membership, for_month). The whole file is one transaction; if any row is
+invalid nothing is kept and every error is reported with its line number.
+"""
+import csv
+import io
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from rest_framework import serializers
+
+from account.models import User
+from .ledger import deferred_refresh, refresh_membership_ledgers
+from .models import Contribution, Membership
+from .schedule import generate_schedule, scheduled_month
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+CONTRIBUTION_COLUMNS = ('amount_paid', 'payment_date', 'due_date')
+
+
+class ImportRowSerializer(serializers.Serializer):
+    email = serializers.EmailField(max_length=255)
+    first_name = serializers.CharField(max_length=30, required=False)
+    last_name = serializers.CharField(max_length=30, required=False)
+    phone = serializers.CharField(max_length=120, required=False)
+    for_month = serializers.DateField(required=False)
+    amount_paid = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    payment_date = serializers.DateField(required=False)
+    due_date = serializers.DateField(required=False)
+
+    def to_internal_value(self, data):
+        # Blank cells mean "not given"; cells past the header have no key.
+        data = {key: value.strip() for key, value in data.items() if key and value and value.strip()}
+        return super().to_internal_value(data)
+
+    def validate(self, data):
+        data['email'] = User.objects.normalize_email(data['email'])
+        if 'for_month' not in data:
+            if any(field in data for field in CONTRIBUTION_COLUMNS):
+                raise serializers.ValidationError({"for_month": "Required when the row records a contribution."})
+            return data
+
+        committee = self.context['committee']
+        amount_paid = data.setdefault('amount_paid', committee.monthly_amount)
+        if amount_paid != committee.monthly_amount:
+            raise serializers.ValidationError({
+                "amount_paid": f"Amount must be exactly {committee.monthly_amount} (no partial or over payments)."
+            })
+        # Store it under the schedule's key for that calendar month.
+        data['for_month'], due_date = scheduled_month(committee, data['for_month'])
+        data.setdefault('due_date', due_date)
+        return data
+
+
+class _Rollback(Exception):
+    pass
+
+
+class CommitteeImport:
+    """Imports one CSV file into ``committee``; see ``run``."""
+
+    def __init__(self, committee, batch_size=IMPORT_BATCH_SIZE, progress=None):
+        self.committee = committee
+        self.batch_size = batch_size
+        # Called as progress(bytes_read, total_bytes) after each batch.
+        self.progress = progress
+        self.errors = []
+        self.error_count = 0
+        self.counts = {
+            'rows': 0, 'users_created': 0, 'memberships_created': 0,
+            'contributions_created': 0, 'contributions_updated': 0,
+        }
+        self.membership_ids = set()
+        self.new_membership_ids = []
+        self.seen_months = set()
+
+    def error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def run(self, fileobj):
+        """Import the binary file object ``fileobj`` and return the report."""
+        self.fileobj = fileobj
+        self.size = fileobj.seek(0, io.SEEK_END)
+        fileobj.seek(0)
+        stream = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+        try:
+            reader = csv.DictReader(stream)
+            if 'email' not in (reader.fieldnames or []):
+                self.error(1, {"file": "The header row must include an email column."})
+                return self.report()
+            try:
+                with transaction.atomic(), deferred_refresh():
+                    self.read(reader)
+                    if self.error_count:
+                        raise _Rollback
+                    generate_schedule(self.committee, Membership.objects.filter(id__in=self.new_membership_ids))
+                    refresh_membership_ledgers(self.membership_ids)
+            except _Rollback:
+                pass
+        finally:
+            # Leave the upload open for its owner to close.
+            stream.detach()
+        return self.report()
+
+    def read(self, reader):
+        batch = []
+        try:
+            for row in reader:
+                self.counts['rows'] += 1
+                serializer = ImportRowSerializer(data=row, context={'committee': self.committee})
+                if serializer.is_valid():
+                    batch.append((reader.line_num, serializer.validated_data))
+                else:
+                    self.error(reader.line_num, serializer.errors)
+                if len(batch) >= self.batch_size:
+                    self.write(batch)
+                    batch = []
+                    if self.progress:
+                        self.progress(self.fileobj.tell(), self.size)
+        except (csv.Error, UnicodeDecodeError) as exc:
+            self.error(reader.line_num + 1, {"file": f"Could not parse the file: {exc}"})
+        self.write(batch)
+
+    def write(self, batch):
+        if not batch or self.error_count:
+            # Everything will be rolled back; only keep validating.
+            return
+        users = self.resolve_users(batch)
+        memberships = self.resolve_memberships(set(users.values()))
+
+        contributions = {}
+        for line, data in batch:
+            if 'for_month' not in data:
+                continue
+            membership_id = memberships[users[data['email']]]
+            key = (membership_id, data['for_month'])
+            if key in self.seen_months:
+                self.error(line, {"for_month": "This member's contribution for this month appears more than once."})
+                continue
+            self.seen_months.add(key)
+            contribution = Contribution(
+                membership_id=membership_id,
+                amount_paid=data['amount_paid'],
+                for_month=data['for_month'],
+                due_date=data['due_date'],
+                payment_date=data.get('payment_date'),
+                payment_status='PAID' if data.get('payment_date') else 'PENDING',
+                verified_by_organizer=True,
+            )
+            # Same PAID/LATE rule that Contribution.save applies.
+            contribution.clean()
+            contributions[key] = contribution
+        if self.error_count or not contributions:
+            return
+
+        membership_ids = {membership_id for membership_id, _ in contributions}
+        existing = set(Contribution.objects.filter(
+            membership_id__in=membership_ids, for_month__in={for_month for _, for_month in contributions}
+        ).values_list('membership_id', 'for_month'))
+        Contribution.objects.bulk_create(
+            contributions.values(),
+            update_conflicts=True,
+            unique_fields=['membership', 'for_month'],
+            update_fields=[
+                'amount_paid', 'due_date', 'payment_date', 'payment_status',
+                'verified_by_organizer', 'updated_at'
+            ],
+        )
+        updated = len(existing & contributions.keys())
+        self.counts['contributions_updated'] += updated
+        self.counts['contributions_created'] += len(contributions) - updated
+
+    def resolve_users(self, batch):
+        """Return ``{email: user_id}`` for the batch, creating the missing users."""
+        emails = {data['email'] for _, data in batch}
+        users = dict(User.objects.filter(email__in=emails).values_list('email', 'id'))
+        new_users = {}
+        for _, data in batch:
+            if data['email'] not in users and data['email'] not in new_users:
+                new_users[data['email']] = User(
+                    email=data['email'],
+                    first_name=data.get('first_name', ''),
+                    last_name=data.get('last_name', ''),
+                    phone=data.get('phone', ''),
+                    # Imported members set a password through the normal reset flow.
+                    password=make_password(None),
+                )
+        if new_users:
+            User.objects.bulk_create(new_users.values())
+            users.update(User.objects.filter(email__in=new_users).values_list('email', 'id'))
+            self.counts['users_created'] += len(new_users)
+        return users
+
+    def resolve_memberships(self, member_ids):
+        """Return ``{member_id: membership_id}``, creating the missing memberships."""
+        memberships = dict(Membership.objects.filter(
+            committee=self.committee, member_id__in=member_ids
+        ).values_list('member_id', 'id'))
+        missing = member_ids - memberships.keys()
+        if missing:
+            Membership.objects.bulk_create([
+                Membership(committee=self.committee, member_id=member_id) for member_id in missing
+            ])
+            created = dict(Membership.objects.filter(
+                committee=self.committee, member_id__in=missing
+            ).values_list('member_id', 'id'))
+            memberships.update(created)
+            self.new_membership_ids.extend(created.values())
+            self.counts['memberships_created'] += len(created)
+        self.membership_ids.update(memberships.values())
+        return memberships
+
+    def report(self):
+        if self.error_count:
+            return {'rows': self.counts['rows'], 'error_count': self.error_count, 'errors': self.errors}
+        return dict(self.counts, error_count=0, errors=[])
+
+
+def import_committee_csv(committee, fileobj, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    return CommitteeImport(committee, batch_size, progress).run(fileobj)
@@ -0,0 +1,175 @@
+"""
+Materialized running totals for memberships and committees.
+
+The ledgers are recomputed from the raw Contribution and Payout rows for the
+affected memberships on every write, so they never drift through lost
+increments. The refresh locks the committee rows before aggregating: under
+READ COMMITTED a concurrent writer to the same committee waits for this
+transaction to commit, then aggregates a snapshot that includes its rows, so
+a stale total can never be upserted last. Bulk code paths that bypass
+``save()`` (``.update()``, ``bulk_create``) must call
+``refresh_membership_ledgers`` themselves, and code that saves or deletes
+many rows can wrap the work in ``deferred_refresh`` so the ledgers are
+recomputed once at the end instead of once per row.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .cache import invalidate_committees
+from .events import publish
+from .models import (
+    Committee, CommitteeLedger, Contribution, Membership, MembershipLedger, Payout
+)
+
+_pending_refresh = ContextVar('pending_ledger_refresh', default=None)
+
+LEDGER_FIELDS = ['paid_total', 'verified_total', 'pending_count', 'late_count', 'overdue_count', 'paid_out_amount']
+
+CONTRIBUTION_TOTALS = {
+    'paid_total': Sum('amount_paid', filter=Q(payment_status='PAID')),
+    'verified_total': Sum('amount_paid', filter=Q(payment_status='PAID', verified_by_organizer=True)),
+    'pending_count': Count('id', filter=Q(payment_status='PENDING')),
+    'late_count': Count('id', filter=Q(payment_status='LATE')),
+    'overdue_count': Count('id', filter=Q(payment_status='OVERDUE')),
+}
+
+
+def empty_totals():
+    return {
+        'paid_total': Decimal('0.00'),
+        'verified_total': Decimal('0.00'),
+        'pending_count': 0,
+        'late_count': 0,
+        'overdue_count': 0,
+        'paid_out_amount': Decimal('0.00'),
+    }
+
+
+def _collect(totals, contribution_rows, payout_rows, key):
+    for row in contribution_rows:
+        values = totals[row.pop(key)]
+        for field, value in row.items():
+            values[field] = value or values[field]
+    for row in payout_rows:
+        totals[row[key]]['paid_out_amount'] = row['total'] or Decimal('0.00')
+    return totals
+
+
+def compute_membership_totals(membership_ids):
+    """Aggregate the raw rows of the given memberships, keyed by membership id."""
+    totals = {membership_id: empty_totals() for membership_id in membership_ids}
+    contributions = Contribution.objects.filter(membership_id__in=totals).order_by().values(
+        'membership_id'
+    ).annotate(**CONTRIBUTION_TOTALS)
+    payouts = Payout.objects.filter(membership_id__in=totals).order_by().values(
+        'membership_id'
+    ).annotate(total=Sum('total_amount'))
+    return _collect(totals, contributions, payouts, 'membership_id')
+
+
+def compute_committee_totals(committee_ids):
+    """Aggregate the raw rows of the given committees, keyed by committee id."""
+    totals = {committee_id: empty_totals() for committee_id in committee_ids}
+    contributions = Contribution.objects.filter(membership__committee_id__in=totals).order_by().values(
+        'membership__committee_id'
+    ).annotate(**CONTRIBUTION_TOTALS)
+    payouts = Payout.objects.filter(membership__committee_id__in=totals).order_by().values(
+        'membership__committee_id'
+    ).annotate(total=Sum('total_amount'))
+    return _collect(totals, contributions, payouts, 'membership__committee_id')
+
+
+@contextmanager
+def deferred_refresh():
+    """
+    Collect ledger refreshes requested inside the block and run them once,
+    in a single transaction with the block's writes, when it exits.
+    """
+    if _pending_refresh.get() is not None:
+        yield
+        return
+    pending = {'memberships': set(), 'committees': set()}
+    with transaction.atomic():
+        token = _pending_refresh.set(pending)
+        try:
+            yield
+        finally:
+            _pending_refresh.reset(token)
+        refreshed = refresh_membership_ledgers(pending['memberships'])
+        refresh_committee_ledgers(pending['committees'] - refreshed)
+
+
+def lock_committees(committee_ids):
+    """
+    Lock the given committee rows until the transaction ends, in id order so
+    concurrent refreshes cannot deadlock, and return the ids that exist.
+    """
+    return set(Committee.objects.select_for_update().filter(
+        id__in=set(committee_ids)
+    ).order_by('id').values_list('id', flat=True))
+
+
+def refresh_committee_ledgers(committee_ids):
+    """Recompute and upsert the ledgers of the given committees."""
+    pending = _pending_refresh.get()
+    if pending is not None:
+        pending['committees'].update(committee_ids)
+        return
+    with transaction.atomic(savepoint=False):
+        _upsert_committee_ledgers(lock_committees(committee_ids))
+
+
+def _upsert_committee_ledgers(committee_ids):
+    # The caller holds the locks of these committees.
+    if not committee_ids:
+        return
+    totals = compute_committee_totals(committee_ids)
+    CommitteeLedger.objects.bulk_create(
+        [CommitteeLedger(committee_id=committee_id, **values) for committee_id, values in totals.items()],
+        update_conflicts=True,
+        unique_fields=['committee'],
+        update_fields=LEDGER_FIELDS + ['updated_at'],
+    )
+    # Cached committee and member payloads embed these totals.
+    invalidate_committees(committee_ids)
+
+
+def refresh_membership_ledgers(membership_ids):
+    """
+    Recompute and upsert the ledgers of the given memberships and their
+    committees. Returns the ids of the committees that were refreshed.
+    """
+    pending = _pending_refresh.get()
+    if pending is not None:
+        pending['memberships'].update(membership_ids)
+        return set()
+    membership_ids = set(membership_ids)
+    if not membership_ids:
+        return set()
+    with transaction.atomic():
+        committees = dict(Membership.objects.filter(id__in=membership_ids).values_list('id', 'committee_id'))
+        if not committees:
+            return set()
+        # Aggregate only once concurrent writers to these committees have committed.
+        committee_ids = lock_committees(committees.values())
+        totals = compute_membership_totals(committees)
+        MembershipLedger.objects.bulk_create(
+            [MembershipLedger(membership_id=membership_id, **values) for membership_id, values in totals.items()],
+            update_conflicts=True,
+            unique_fields=['membership'],
+            update_fields=LEDGER_FIELDS + ['updated_at'],
+        )
+        _upsert_committee_ledgers(committee_ids)
+    for committee_id in committee_ids:
+        memberships = {
+            membership_id: values for membership_id, values in totals.items()
+            if committees[membership_id] == committee_id
+        }
+        publish(committee_id, 'ledger', {'memberships': memberships}, members={
+            membership_id: {'memberships': {membership_id: values}} for membership_id, values in memberships.items()
+        })
+    return committee_ids
@@ -0,0 +1,87 @@
+"""
+Concurrent HTTP load test of the polling endpoints, sync against async.
+
+``load()`` fires requests at an already running server from a pool of
+threads, each holding one keep-alive connection, and reports throughput and
+latency percentiles. ``ENDPOINTS`` pairs each synchronous path (served by
+``conf.wsgi``) with its ``async/`` twin (served by ``conf.asgi``); the
+``load_test`` management command runs both and prints them side by side.
+"""
+import http.client
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .benchmarks import _percentile
+
+# name: (sync path, async path, required parameter)
+ENDPOINTS = {
+    'dashboard': ('/committee/dashboard/', '/committee/async/dashboard/', None),
+    'committee-list': ('/committee/committees/', '/committee/async/committees/', None),
+    'committee-detail': (
+        '/committee/committees/{committee}/', '/committee/async/committees/{committee}/', 'committee'
+    ),
+    'membership-list': (
+        '/committee/committees/{committee}/members/', '/committee/async/committees/{committee}/members/', 'committee'
+    ),
+    'contribution-list': (
+        '/committee/memberships/{membership}/contributions/',
+        '/committee/async/memberships/{membership}/contributions/', 'membership'
+    ),
+}
+
+
+def load(base_url, path, headers=None, concurrency=20, requests=500, timeout=30):
+    """
+    Issue ``requests`` GETs of ``path`` with ``concurrency`` clients and
+    return requests/second, p50/p99 latency and the error count.
+    """
+    url = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+    lock = threading.Lock()
+    remaining = [requests]
+
+    def take():
+        with lock:
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def client():
+        timings, errors = [], 0
+        connection = connection_class(url.netloc, timeout=timeout)
+        try:
+            while take():
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', url.path.rstrip('/') + path, headers=headers or {})
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 400:
+                        errors += 1
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    connection.close()
+                    connection = connection_class(url.netloc, timeout=timeout)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+        return timings, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: client(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    timings = [timing for client_timings, _ in results for timing in client_timings]
+    return {
+        'requests': len(timings),
+        'errors': sum(errors for _, errors in results),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(len(timings) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(statistics.median(timings), 3) if timings else None,
+        'p99_ms': round(_percentile(timings, 99), 3) if timings else None,
+    }
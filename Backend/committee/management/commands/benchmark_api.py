@@ -0,0 +1,98 @@
+import json
+import platform
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from committee.benchmarks import (
+    auth_throughput, build_routes, compare, import_throughput, login_throughput, run, seed
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with synthetic data, hit every API route "
+        "and record query count, p50/p95 latency and peak memory per route."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--committees', type=int, default=20)
+        parser.add_argument('--contributions', type=int, default=5000)
+        parser.add_argument('--import-rows', type=int, default=5000,
+                            help="Contribution rows in the CSV import throughput run (0 to skip).")
+        parser.add_argument('--auth-requests', type=int, default=200,
+                            help="Requests per authentication class in the auth throughput run (0 to skip).")
+        parser.add_argument('--login-requests', type=int, default=20,
+                            help="Logins per password hashing cost in the login throughput run (0 to skip).")
+        parser.add_argument('--iterations', type=int, default=10, help="Requests per route.")
+        parser.add_argument('--output', default='benchmark.json', help="Where to write the JSON results.")
+        parser.add_argument('--baseline', help="Results file to compare against; regressions fail the run.")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Allowed p95 latency growth over the baseline, as a fraction.")
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help="Ignore p95 changes smaller than this many milliseconds.")
+        parser.add_argument('--keepdb', action='store_true', help="Reuse the test database between runs.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())['routes']
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            self.stdout.write("Seeding benchmark data...")
+            dataset = seed(options['users'], options['committees'], options['contributions'])
+            results = run(build_routes(), options['iterations'])
+            imported = import_throughput(options['import_rows']) if options['import_rows'] else None
+            authentication = auth_throughput(options['auth_requests']) if options['auth_requests'] else None
+            logins = login_throughput(options['login_requests']) if options['login_requests'] else None
+            vendor = connection.vendor
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'dataset': dataset,
+                'iterations': options['iterations'],
+                'database': vendor,
+                'python': platform.python_version(),
+            },
+            'routes': results,
+            'import': imported,
+            'authentication': authentication,
+            'login': logins,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2))
+
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:28} {metrics['method']:6} q={metrics['queries']:<4} "
+                f"p50={metrics['p50_ms']:>9.2f}ms p95={metrics['p95_ms']:>9.2f}ms peak={metrics['peak_kb']:>9.1f}KB"
+            )
+        if imported:
+            self.stdout.write(
+                f"CSV import: {imported['rows']} rows in {imported['seconds']}s "
+                f"({imported['rows_per_second']} rows/s, {imported['queries']} queries)"
+            )
+        for name, metrics in (authentication or {}).items():
+            self.stdout.write(
+                f"Auth {name:10} {metrics['requests_per_second']:>9.1f} req/s, "
+                f"{metrics['queries_per_request']} queries/request"
+            )
+        for name, metrics in (logins or {}).items():
+            self.stdout.write(
+                f"Login {name:14} {metrics['iterations']:>8} iterations: {metrics['logins_per_second']:>7.1f} logins/s, "
+                f"{metrics['queries_per_login']} queries/login"
+            )
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is not None:
+            regressions = compare(results, baseline, options['threshold'], options['min_delta_ms'])
+            if regressions:
+                raise CommandError("Benchmark regressions:\n" + "\n".join(regressions))
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,72 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+from committee.benchmarks import seed, write_throughput
+
+# How SQLite was configured before conf.database: rollback journal,
+# deferred transactions and the driver's 5 second busy timeout.
+SQLITE_DEFAULTS = {'timeout': 5, 'init_command': 'PRAGMA journal_mode=DELETE'}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and measure concurrent write throughput. "
+        "On SQLite the test database is a file and the run is repeated with the old "
+        "defaults (rollback journal, deferred transactions) to show what WAL and "
+        "BEGIN IMMEDIATE change; on Postgres it measures the configured settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=400, help="Contribution updates per run.")
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--committees', type=int, default=20)
+        parser.add_argument('--contributions', type=int, default=2000)
+        parser.add_argument('--output', help="Also write the JSON results to this file.")
+
+    def handle(self, *args, **options):
+        settings_dict = connections['default'].settings_dict
+        directory = None
+        if connection.vendor == 'sqlite':
+            # Threads cannot share an in-memory test database.
+            directory = tempfile.TemporaryDirectory()
+            settings_dict.setdefault('TEST', {})['NAME'] = str(Path(directory.name) / 'benchmark.sqlite3')
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        results = {}
+        try:
+            self.stdout.write("Seeding benchmark data...")
+            seed(options['users'], options['committees'], options['contributions'])
+            configured = dict(settings_dict['OPTIONS'])
+            profiles = {'configured': configured}
+            if connection.vendor == 'sqlite':
+                profiles = {'sqlite-defaults': SQLITE_DEFAULTS, 'configured': configured}
+            for name, profile in profiles.items():
+                # Every thread opens its own connection from these settings.
+                connection.close()
+                settings_dict['OPTIONS'] = profile
+                results[name] = write_throughput(options['threads'], options['writes'])
+            settings_dict['OPTIONS'] = configured
+        finally:
+            connection.close()
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+            if directory:
+                directory.cleanup()
+
+        for name, metrics in results.items():
+            self.stdout.write(
+                f"{name:16} {metrics['threads']} threads: {metrics['writes']} writes in {metrics['seconds']}s "
+                f"({metrics['writes_per_second']} writes/s), {metrics['failed']} failed"
+            )
+            for error in metrics['errors']:
+                self.stdout.write(f"    {error}")
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
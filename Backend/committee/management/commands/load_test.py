@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from committee.loadtest import ENDPOINTS, load
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the polling endpoints on running servers: the sync views on the WSGI "
+        "application and their async twins on the ASGI application, e.g. "
+        "`gunicorn conf.wsgi -b :8000 --threads 8` and `uvicorn conf.asgi:application --port 8001`, "
+        "both against the same database. Prints requests/sec and p50/p99 latency per endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--asgi-url', default='http://127.0.0.1:8001')
+        parser.add_argument('--token', help="JWT access token; the endpoints other than committee-list need one.")
+        parser.add_argument('--committee', type=int, help="Committee id for the committee endpoints.")
+        parser.add_argument('--membership', type=int, help="Membership id for the contribution endpoint.")
+        parser.add_argument('--endpoint', action='append', choices=sorted(ENDPOINTS),
+                            help="Endpoint to test (repeatable); all that can run by default.")
+        parser.add_argument('--concurrency', type=int, default=50, help="Simultaneous clients.")
+        parser.add_argument('--requests', type=int, default=1000, help="Requests per endpoint and server.")
+        parser.add_argument('--output', help="Also write the JSON results to this file.")
+
+    def handle(self, *args, **options):
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else {}
+        names = options['endpoint'] or [
+            name for name, (_, _, parameter) in ENDPOINTS.items() if parameter is None or options[parameter]
+        ]
+
+        results = {}
+        for name in names:
+            sync_path, async_path, parameter = ENDPOINTS[name]
+            if parameter and not options[parameter]:
+                raise CommandError(f"{name} needs --{parameter}.")
+            params = {parameter: options[parameter]} if parameter else {}
+            results[name] = {}
+            for server, base_url, path in (
+                ('wsgi', options['wsgi_url'], sync_path), ('asgi', options['asgi_url'], async_path)
+            ):
+                metrics = load(
+                    base_url, path.format(**params), headers, options['concurrency'], options['requests']
+                )
+                results[name][server] = metrics
+                self.stdout.write(
+                    f"{name:18} {server:4} {metrics['requests_per_second'] or 0:>9.1f} req/s "
+                    f"p50={metrics['p50_ms'] or 0:>9.2f}ms p99={metrics['p99_ms'] or 0:>9.2f}ms "
+                    f"errors={metrics['errors']}"
+                )
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
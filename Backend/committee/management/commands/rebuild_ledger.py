@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from committee.ledger import (
+    LEDGER_FIELDS, compute_committee_totals, compute_membership_totals,
+    refresh_committee_ledgers, refresh_membership_ledgers
+)
+from committee.models import Committee, CommitteeLedger, Membership, MembershipLedger
+
+
+class Command(BaseCommand):
+    help = "Reconcile the committee and membership ledgers against the raw contribution and payout rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--committee', type=int, action='append', dest='committees',
+                            help="Only reconcile this committee id (may be repeated).")
+        parser.add_argument('--check', action='store_true',
+                            help="Report mismatches without writing; exit with an error if any are found.")
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help="Number of memberships recomputed per transaction.")
+
+    def handle(self, *args, **options):
+        committees = Committee.objects.order_by('id')
+        if options['committees']:
+            committees = committees.filter(id__in=options['committees'])
+        committee_ids = list(committees.values_list('id', flat=True))
+        membership_ids = list(
+            Membership.objects.filter(committee_id__in=committee_ids).order_by('id').values_list('id', flat=True)
+        )
+
+        mismatched_memberships = self.diff(
+            MembershipLedger, 'membership_id', membership_ids, compute_membership_totals, options['chunk_size']
+        )
+        mismatched_committees = self.diff(
+            CommitteeLedger, 'committee_id', committee_ids, compute_committee_totals, options['chunk_size']
+        )
+
+        for label, ids in (('membership', mismatched_memberships), ('committee', mismatched_committees)):
+            if ids:
+                self.stdout.write(f"{len(ids)} {label} ledger(s) out of sync: {', '.join(map(str, ids[:20]))}")
+
+        if options['check']:
+            if mismatched_memberships or mismatched_committees:
+                raise CommandError("Ledger is out of sync with contributions and payouts.")
+            self.stdout.write(self.style.SUCCESS(
+                f"Ledger in sync for {len(committee_ids)} committees and {len(membership_ids)} memberships."
+            ))
+            return
+
+        chunk_size = options['chunk_size']
+        for start in range(0, len(membership_ids), chunk_size):
+            refresh_membership_ledgers(membership_ids[start:start + chunk_size])
+        # Committees without memberships still need a (zeroed) ledger row.
+        with transaction.atomic():
+            refresh_committee_ledgers(committee_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt ledgers for {len(committee_ids)} committees and {len(membership_ids)} memberships."
+        ))
+
+    def diff(self, ledger_model, key, ids, compute, chunk_size):
+        """Return the ids whose stored ledger differs from (or is missing against) the raw totals."""
+        mismatched = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            expected = compute(chunk)
+            stored = {
+                row.pop(key): row
+                for row in ledger_model.objects.filter(**{f'{key}__in': chunk}).values(key, *LEDGER_FIELDS)
+            }
+            mismatched.extend(obj_id for obj_id in chunk if stored.get(obj_id) != expected[obj_id])
+        return mismatched
@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from committee.sweeper import SWEEP_CHUNK_SIZE, sweep
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark overdue PENDING contributions as OVERDUE and committees past their end date "
+        "as COMPLETED. Meant to run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Sweep as of this date (YYYY-MM-DD) instead of today.")
+        parser.add_argument('--chunk-size', type=int, default=SWEEP_CHUNK_SIZE,
+                            help="Number of committees swept per transaction.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError("--date must be formatted as YYYY-MM-DD.")
+
+        report = sweep(today, options['chunk_size'], options['dry_run'])
+        prefix = "Would mark" if options['dry_run'] else "Marked"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} {report['contributions_marked_overdue']} contribution(s) OVERDUE across "
+            f"{report['committees_swept']} committee(s) and {report['committees_completed']} committee(s) "
+            f"COMPLETED as of {report['date']} in {report['seconds']}s."
+        ))
@@ -1,9 +1,37 @@
-from django.db import models
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from account.models import User
 from dateutil.relativedelta import relativedelta
 from django.utils import timezone
 
 
+def _contribution_total(membership, outer='pk', **filters):
+    """Subquery summing ``amount_paid`` of the contributions whose ``membership`` lookup is ``outer``."""
+    return Subquery(
+        Contribution.objects.filter(**{membership: OuterRef(outer)}, **filters).order_by()
+        .values(membership).annotate(total=Sum('amount_paid')).values('total'),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+class CommitteeQuerySet(models.QuerySet):
+    def with_stats(self):
+        """
+        Annotate ``paid_total`` and ``active_members_count``, read by
+        ``total_collected`` and ``current_members_count``. Both are
+        subqueries, so they stay correct next to other joins.
+        """
+        active_members = Membership.objects.filter(
+            committee=OuterRef('pk'), status='ACTIVE'
+        ).order_by().values('committee').annotate(count=Count('id')).values('count')
+        return self.annotate(
+            paid_total=_contribution_total('membership__committee', payment_status='PAID'),
+            active_members_count=Coalesce(Subquery(active_members), 0),
+        )
+
+
 class Committee(models.Model):
     STATUS_CHOICES = [
         ('ACTIVE', 'Active'),
@@ -20,6 +48,15 @@ class Committee(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CommitteeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organizer', 'status'], name='committee_organizer_status_idx'),
+            # Nightly sweep: active committees past their end date.
+            models.Index(fields=['status', 'end_date'], name='committee_status_end_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -30,10 +67,43 @@ class Committee(models.Model):
 
     @property
     def total_collected(self):
-        return Contribution.objects.filter(
-            membership__committee=self,
-            payment_status='PAID'
-        ).aggregate(total=models.Sum('amount_paid'))['total'] or 0
+        # ``with_stats`` annotates this as ``paid_total`` to avoid a per-row aggregate.
+        if hasattr(self, 'paid_total'):
+            return self.paid_total or 0
+        try:
+            return self.ledger.paid_total
+        except ObjectDoesNotExist:
+            pass
+        return Contribution.objects.filter(membership__committee=self).paid().total()
+
+    @property
+    def current_members_count(self):
+        if hasattr(self, 'active_members_count'):
+            return self.active_members_count
+        # CommitteeView prefetches the active memberships for members_list.
+        if hasattr(self, 'active_memberships'):
+            return len(self.active_memberships)
+        return self.memberships.filter(status='ACTIVE').count()
+
+
+class MembershipQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Memberships of the committees ``user`` organizes or has (or had) a membership in."""
+        return self.filter(
+            models.Q(committee__organizer_id=user.id) |
+            models.Q(committee_id__in=Membership.objects.filter(member_id=user.id).values('committee_id'))
+        )
+
+    def with_related(self):
+        # What access checks and MembershipSerializer read from each row.
+        return self.select_related('member', 'committee')
+
+    def with_totals(self):
+        """Annotate ``paid_total`` and ``verified_total``, read by ``total_contributed`` and ``total_verified``."""
+        return self.annotate(
+            paid_total=_contribution_total('membership', payment_status='PAID'),
+            verified_total=_contribution_total('membership', payment_status='PAID', verified_by_organizer=True),
+        )
 
 
 class Membership(models.Model):
@@ -50,9 +120,20 @@ class Membership(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MembershipQuerySet.as_manager()
+
     class Meta:
         unique_together = ('committee', 'member')
         ordering = ['joined_at']
+        indexes = [
+            models.Index(fields=['committee', 'status'], name='membership_comm_status_idx'),
+            models.Index(fields=['member', 'status'], name='membership_member_status_idx'),
+            # Partial index; skipped on backends without partial index support.
+            models.Index(
+                fields=['committee', 'joined_at'], condition=models.Q(status='ACTIVE'),
+                name='membership_active_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.member.full_name} - {self.committee.name}"
@@ -66,16 +147,56 @@ class Membership(models.Model):
 
     @property
     def total_contributed(self):
-        return self.contributions.filter(payment_status='PAID').aggregate(
-            total=models.Sum('amount_paid')
-        )['total'] or 0
+        if hasattr(self, 'paid_total'):
+            return self.paid_total or 0
+        try:
+            return self.ledger.paid_total
+        except ObjectDoesNotExist:
+            pass
+        return self.contributions.paid().total()
+
+    @property
+    def total_verified(self):
+        if hasattr(self, 'verified_total'):
+            return self.verified_total or 0
+        try:
+            return self.ledger.verified_total
+        except ObjectDoesNotExist:
+            pass
+        return self.contributions.paid().filter(verified_by_organizer=True).total()
+
+
+class ContributionQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Contributions of ``user``'s own memberships and of the committees they organize."""
+        return self.filter(
+            models.Q(membership__member_id=user.id) | models.Q(membership__committee__organizer_id=user.id)
+        )
+
+    def with_related(self):
+        # What access checks and ContributionSerializer read from each row.
+        return self.select_related('membership__member', 'membership__committee')
+
+    def paid(self):
+        return self.filter(payment_status='PAID')
+
+    def for_month(self, month):
+        """Contributions due for the calendar month of the date ``month``."""
+        start = month.replace(day=1)
+        return self.filter(for_month__gte=start, for_month__lt=start + relativedelta(months=1))
+
+    def total(self):
+        return self.aggregate(total=Sum('amount_paid'))['total'] or 0
 
 
 class Contribution(models.Model):
+    # LATE is a payment made after the due date; OVERDUE is an unpaid
+    # instalment past its due date, set by the nightly sweep.
     PAYMENT_STATUS_CHOICES = [
         ('PAID', 'Paid'),
         ('PENDING', 'Pending'),
         ('LATE', 'Late'),
+        ('OVERDUE', 'Overdue'),
     ]
     membership = models.ForeignKey(Membership, on_delete=models.CASCADE, related_name='contributions')
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2)
@@ -87,9 +208,28 @@ class Contribution(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ContributionQuerySet.as_manager()
+
     class Meta:
         unique_together = ('membership', 'for_month')
         ordering = ['for_month']
+        indexes = [
+            # Also serves lookups on (membership, payment_status) through its prefix.
+            models.Index(
+                fields=['membership', 'payment_status', 'verified_by_organizer'],
+                name='contribution_status_idx'
+            ),
+            # Partial index; skipped on backends without partial index support.
+            models.Index(
+                fields=['membership', 'amount_paid'], condition=models.Q(payment_status='PAID'),
+                name='contribution_paid_idx'
+            ),
+            # Nightly sweep: unpaid PENDING rows past their due date.
+            models.Index(
+                fields=['due_date'], condition=models.Q(payment_status='PENDING'),
+                name='contribution_pending_due_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.membership.member.full_name} paid {self.amount_paid} for {self.for_month}"
@@ -100,7 +240,27 @@ class Contribution(models.Model):
 
     def save(self, *args, **kwargs):
         self.clean()
-        super().save(*args, **kwargs)
+        # The ledger is refreshed from post_save; keep both writes in one transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class PayoutQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Payouts of ``user``'s own memberships and of the committees they organize."""
+        return self.filter(
+            models.Q(membership__member_id=user.id) | models.Q(membership__committee__organizer_id=user.id)
+        )
+
+    def with_related(self):
+        # What access checks and PayoutSerializer read from each row.
+        return self.select_related('membership__member', 'membership__committee__organizer')
+
+    def with_totals(self):
+        """Annotate the membership's ``verified_total``, read by PayoutSerializer's ``total_eligible``."""
+        return self.annotate(verified_total=_contribution_total(
+            'membership', 'membership_id', payment_status='PAID', verified_by_organizer=True
+        ))
 
 
 class Payout(models.Model):
@@ -114,11 +274,46 @@ class Payout(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PayoutQuerySet.as_manager()
+
     class Meta:
         unique_together = ('membership',)
 
     def __str__(self):
-        return f"{self.membership.member.name} received {self.total_amount} from {self.membership.committee.name}"
+        return f"{self.membership.member.full_name} received {self.total_amount} from {self.membership.committee.name}"
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class LedgerTotals(models.Model):
+    paid_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    verified_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    paid_out_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class MembershipLedger(LedgerTotals):
+    """Running totals for one membership, kept in sync by ``committee.ledger``."""
+    membership = models.OneToOneField(Membership, on_delete=models.CASCADE, related_name='ledger')
+
+    def __str__(self):
+        return f"Ledger for membership {self.membership_id}"
+
+
+class CommitteeLedger(LedgerTotals):
+    """Running totals for a whole committee, kept in sync by ``committee.ledger``."""
+    committee = models.OneToOneField(Committee, on_delete=models.CASCADE, related_name='ledger')
+
+    def __str__(self):
+        return f"Ledger for committee {self.committee_id}"
 
 
 # class CashCollection(models.Model):
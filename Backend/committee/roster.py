@@ -0,0 +1,77 @@
+"""
+Set-based reconciliation of a committee's memberships against a roster.
+
+The existing memberships are loaded once and diffed in memory; the result is
+written with one ``bulk_create`` for new members, one ``bulk_update`` for
+status changes and one UPDATE for active members missing from the roster,
+so the statement count does not grow with the roster (beyond the backend's
+own batch limits). ``left_at`` is kept in line with the status the same way
+``Membership.save`` does, and members who stop being active lose the unpaid
+PENDING instalments that are not due yet, which ``generate_schedule`` only
+keeps for active memberships.
+"""
+from django.utils import timezone
+
+from .cache import invalidate_committees
+from .ledger import deferred_refresh
+from .models import Contribution, Membership
+
+
+def _left_at(status, now):
+    return None if status == 'ACTIVE' else now
+
+
+def reconcile_members(committee, roster):
+    """
+    Make ``committee``'s memberships match ``roster`` (``{member_id: status}``):
+    missing members are added, changed statuses are applied and active
+    members left off the roster are marked REMOVED. Returns the number of
+    memberships created, updated and removed.
+
+    Instalments of departed members that are already due stay owed.
+    """
+    now = timezone.now()
+    existing = {
+        membership.member_id: membership
+        for membership in Membership.objects.filter(committee=committee).only('id', 'member_id', 'status', 'left_at')
+    }
+
+    to_create, to_update = [], []
+    for member_id, status in roster.items():
+        membership = existing.get(member_id)
+        if membership is None:
+            to_create.append(Membership(
+                committee=committee, member_id=member_id, status=status, left_at=_left_at(status, now)
+            ))
+        elif membership.status != status:
+            membership.status = status
+            membership.left_at = _left_at(status, now)
+            membership.updated_at = now
+            to_update.append(membership)
+
+    to_remove = [
+        membership.id for member_id, membership in existing.items()
+        if member_id not in roster and membership.status == 'ACTIVE'
+    ]
+
+    departed = to_remove + [membership.id for membership in to_update if membership.status != 'ACTIVE']
+
+    with deferred_refresh():
+        if to_create:
+            Membership.objects.bulk_create(to_create)
+        if to_update:
+            Membership.objects.bulk_update(to_update, ['status', 'left_at', 'updated_at'])
+        if to_remove:
+            Membership.objects.filter(id__in=to_remove).update(status='REMOVED', left_at=now, updated_at=now)
+        if departed:
+            Contribution.objects.filter(
+                membership_id__in=departed,
+                payment_status='PENDING',
+                payment_date__isnull=True,
+                verified_by_organizer=False,
+                due_date__gt=timezone.localdate(),
+            ).delete()
+
+    if to_create or to_update or to_remove:
+        invalidate_committees([committee.id])
+    return {'created': len(to_create), 'updated': len(to_update), 'removed': len(to_remove)}
@@ -0,0 +1,75 @@
+"""
+Materializes the PENDING contribution schedule of a committee.
+
+Every active membership gets one Contribution row per month of the
+committee, so "who hasn't paid this month" is an index lookup instead of a
+set difference. Generation is idempotent: existing rows are left alone and
+only untouched unpaid rows that fall outside the schedule are removed.
+"""
+from datetime import timedelta
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+
+from .ledger import deferred_refresh, refresh_membership_ledgers
+from .models import Contribution, Membership
+
+SCHEDULE_BATCH_SIZE = 1000
+
+
+def _instalment(committee, offset):
+    for_month = committee.start_date + relativedelta(months=offset)
+    # The instalment falls due COMMITTEE_GRACE_DAYS after the monthly anniversary of the start date.
+    return for_month, for_month + timedelta(days=getattr(settings, 'COMMITTEE_GRACE_DAYS', 0))
+
+
+def schedule_months(committee):
+    """Return the (for_month, due_date) pairs of the committee, one per month."""
+    return [_instalment(committee, offset) for offset in range(committee.duration_months)]
+
+
+def scheduled_month(committee, month):
+    """
+    Return the (for_month, due_date) pair of the calendar month of the date
+    ``month``. Contributions recorded for any day of a month are stored
+    under this key, so they land on the scheduled row instead of next to it.
+    """
+    start = committee.start_date
+    return _instalment(committee, (month.year - start.year) * 12 + month.month - start.month)
+
+
+def generate_schedule(committee, memberships=None):
+    """
+    Create the missing PENDING contributions for ``memberships`` (all active
+    memberships of ``committee`` by default) and drop unpaid ones left over
+    from a previous start date or duration.
+    """
+    if memberships is None:
+        memberships = Membership.objects.filter(committee=committee, status='ACTIVE').only('id', 'status')
+    membership_ids = [m.id for m in memberships if m.status == 'ACTIVE']
+    if not membership_ids:
+        return
+
+    months = schedule_months(committee)
+    rows = [
+        Contribution(
+            membership_id=membership_id,
+            amount_paid=committee.monthly_amount,
+            for_month=for_month,
+            due_date=due_date,
+            payment_status='PENDING',
+        )
+        for membership_id in membership_ids
+        for for_month, due_date in months
+    ]
+
+    with deferred_refresh():
+        Contribution.objects.filter(
+            membership_id__in=membership_ids,
+            # Unpaid rows the late-payment sweep has already marked OVERDUE too.
+            payment_status__in=['PENDING', 'OVERDUE'],
+            payment_date__isnull=True,
+            verified_by_organizer=False,
+        ).exclude(for_month__in=[for_month for for_month, _ in months]).delete()
+        Contribution.objects.bulk_create(rows, batch_size=SCHEDULE_BATCH_SIZE, ignore_conflicts=True)
+        refresh_membership_ledgers(membership_ids)
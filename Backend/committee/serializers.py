@@ -1,11 +1,14 @@
 from rest_framework import serializers
+from conf.profiling import ProfiledSerializerMixin
 from .models import Committee, Membership, Contribution, Payout
 from django.utils import timezone
-from django.db.models import Sum
-from account.models import User
+from django.db import transaction
+from .ledger import refresh_membership_ledgers
+from .roster import reconcile_members
+from .schedule import generate_schedule, scheduled_month
 
 
-class MembershipSerializer(serializers.ModelSerializer):
+class MembershipSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     member_name = serializers.CharField(source='member.full_name', read_only=True)
     committee_name = serializers.CharField(source='committee.name', read_only=True)
     total_contributed = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -22,9 +25,15 @@ class MembershipSerializer(serializers.ModelSerializer):
             'member': {'write_only': True},
         }
 
+    def get_validators(self):
+        # A nested roster on a committee is reconciled against the existing rows.
+        if self.parent is not None:
+            return []
+        return super().get_validators()
+
     def validate(self, data):
         # Only check for duplicates when creating new membership
-        if self.instance is None and Membership.objects.filter(
+        if self.instance is None and self.parent is None and Membership.objects.filter(
             committee=data['committee'],
             member=data['member'],
             status='ACTIVE'
@@ -40,11 +49,11 @@ class MembershipSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommitteeSerializer(serializers.ModelSerializer):
+class CommitteeSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     organizer_name = serializers.CharField(source='organizer.full_name', read_only=True)
     status = serializers.CharField(read_only=True)
     total_collected = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
-    current_members_count = serializers.SerializerMethodField()
+    current_members_count = serializers.IntegerField(read_only=True)
     total_amount = serializers.SerializerMethodField()
     members = MembershipSerializer(many=True, write_only=True, required=False)
     members_list = serializers.SerializerMethodField()
@@ -58,22 +67,23 @@ class CommitteeSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['organizer', 'end_date', 'created_at', 'updated_at']
 
-    def get_current_members_count(self, obj):
-        return obj.memberships.filter(status='ACTIVE').count()
-
     def get_total_amount(self, obj):
         monthly_amount = obj.monthly_amount
         duration_months = obj.duration_months
         return monthly_amount * duration_months
 
     def get_members_list(self, obj):
+        # Use the prefetched active memberships when the view provided them.
+        memberships = getattr(obj, 'active_memberships', None)
+        if memberships is None:
+            memberships = obj.memberships.filter(status='ACTIVE').select_related('member')
         return [
             {
                 'id': m.member.id,
                 'name': m.member.full_name,
                 'status': m.status,
             }
-            for m in obj.memberships.filter(status='ACTIVE')
+            for m in memberships
         ]
 
     def validate(self, data):
@@ -88,18 +98,18 @@ class CommitteeSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         members_data = validated_data.pop('members', [])
-        organizer = self.context['request'].user
+        # CommitteeView.perform_create passes the organizer through save().
+        organizer = validated_data.pop('organizer', self.context['request'].user)
 
         # Create committee
         committee = Committee.objects.create(organizer=organizer, **validated_data)
 
         # Create memberships
-        for member_data in members_data:
-            Membership.objects.create(
-                committee=committee,
-                member=member_data['member'],
-                status=member_data.get('status', 'ACTIVE')
-            )
+        reconcile_members(committee, {
+            member_data['member'].id: member_data.get('status', 'ACTIVE') for member_data in members_data
+        })
+
+        generate_schedule(committee)
         return committee
 
     def update(self, instance, validated_data):
@@ -111,28 +121,14 @@ class CommitteeSerializer(serializers.ModelSerializer):
         instance.save()
 
         if members_data is not None:
-            # Remove existing active members not in new list
-            new_member_ids = [m['member'].id if isinstance(m['member'], User) else m['member'] for m in members_data]
-            Membership.objects.filter(committee=instance, status='ACTIVE').exclude(member_id__in=new_member_ids).update(status='REMOVED')
-
-            # Add new members
-            for member_data in members_data:
-                member_id = member_data['member']
-                status = member_data.get('status', 'ACTIVE')
-
-                membership, created = Membership.objects.get_or_create(
-                    committee=instance,
-                    member_id=member_id,
-                    defaults={'status': status}
-                )
-                if not created and membership.status != status:
-                    membership.status = status
-                    membership.save()
+            reconcile_members(instance, {
+                member_data['member'].id: member_data.get('status', 'ACTIVE') for member_data in members_data
+            })
 
         return instance
 
 
-class ContributionSerializer(serializers.ModelSerializer):
+class ContributionSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     member_name = serializers.CharField(source='membership.member.full_name', read_only=True)
     committee_name = serializers.CharField(source='membership.committee.name', read_only=True)
     required_amount = serializers.DecimalField(source='membership.committee.monthly_amount', max_digits=10, decimal_places=2, read_only=True)
@@ -147,6 +143,12 @@ class ContributionSerializer(serializers.ModelSerializer):
         read_only_fields = ['payment_status', 'verified_by_organizer', 'created_at', 'updated_at']
         extra_kwargs = {'membership': {'write_only': True}}
 
+    def get_validators(self):
+        # A new contribution for a scheduled month updates that row (see create).
+        if self.instance is None:
+            return []
+        return super().get_validators()
+
     def validate(self, data):
         membership = data.get('membership', getattr(self.instance, 'membership', None))
         if not membership:
@@ -174,10 +176,37 @@ class ContributionSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and request.user.is_authenticated and hasattr(request.user, 'is_organizer') and request.user.is_organizer:
             validated_data['verified_by_organizer'] = True
-        return super().create(validated_data)
+
+        membership = validated_data['membership']
+        validated_data['for_month'], _ = scheduled_month(membership.committee, validated_data['for_month'])
+        with transaction.atomic():
+            scheduled = Contribution.objects.select_for_update().filter(
+                membership=membership, for_month=validated_data['for_month']
+            ).first()
+            if scheduled is not None:
+                # Only an unpaid scheduled row is filled in; a recorded payment is changed through its own endpoint.
+                if scheduled.payment_status not in ('PENDING', 'OVERDUE'):
+                    raise serializers.ValidationError({
+                        "for_month": "A payment has already been recorded for this month."
+                    })
+                return self.update(scheduled, validated_data)
+            return super().create(validated_data)
+
+
+class ContributionBulkVerifySerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    committee = serializers.IntegerField(required=False)
+    for_month = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if 'ids' not in data and 'committee' not in data:
+            raise serializers.ValidationError("Provide either a list of ids or a committee to verify.")
+        if 'for_month' in data and 'committee' not in data:
+            raise serializers.ValidationError({"for_month": "for_month can only be used together with committee."})
+        return data
 
 
-class PayoutSerializer(serializers.ModelSerializer):
+class PayoutSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     member_name = serializers.CharField(source='membership.member.full_name', read_only=True)
     committee_name = serializers.CharField(source='membership.committee.name', read_only=True)
     organizer_name = serializers.CharField(source='membership.committee.organizer.full_name', read_only=True)
@@ -205,11 +234,12 @@ class PayoutSerializer(serializers.ModelSerializer):
     def get_total_eligible(self, obj):
         """Calculate total verified contributions for this membership"""
         # Handle both Payout objects and Membership objects
-        membership = obj.membership if isinstance(obj, Payout) else obj
-        return membership.contributions.filter(
-            payment_status='PAID',
-            verified_by_organizer=True
-        ).aggregate(total=Sum('amount_paid'))['total'] or 0
+        if isinstance(obj, Payout):
+            # Payout lists annotate the membership's total (PayoutQuerySet.with_totals).
+            if hasattr(obj, 'verified_total'):
+                return obj.verified_total or 0
+            obj = obj.membership
+        return obj.total_verified
 
     def validate(self, data):
         membership = data.get('membership', getattr(self.instance, 'membership', None))
@@ -243,3 +273,121 @@ class PayoutSerializer(serializers.ModelSerializer):
         if 'received_by' not in validated_data:
             validated_data['received_by'] = self.context['request'].user
         return super().create(validated_data)
+
+
+class BulkContributionRowSerializer(serializers.Serializer):
+    membership = serializers.IntegerField()
+    amount_paid = serializers.DecimalField(max_digits=10, decimal_places=2)
+    payment_date = serializers.DateField(required=False, allow_null=True)
+
+
+class BulkContributionSerializer(serializers.Serializer):
+    """
+    Records (or updates) one month of contributions for many memberships of
+    the committee passed in the context. Rows are validated in memory against
+    a single membership lookup and written with one upsert.
+    """
+    for_month = serializers.DateField()
+    due_date = serializers.DateField()
+    contributions = BulkContributionRowSerializer(many=True, allow_empty=False)
+
+    def validate(self, data):
+        committee = self.context['committee']
+        # Any day of a month records that month's scheduled row.
+        data['for_month'], _ = scheduled_month(committee, data['for_month'])
+        rows = data['contributions']
+        memberships = {
+            m.id: m for m in Membership.objects.filter(
+                committee=committee, id__in=[row['membership'] for row in rows]
+            )
+        }
+
+        errors, seen = [], set()
+        for row in rows:
+            row_errors = {}
+            membership = memberships.get(row['membership'])
+            if membership is None:
+                row_errors['membership'] = "Membership does not belong to this committee."
+            elif membership.status != 'ACTIVE':
+                row_errors['membership'] = "Membership is not active."
+            elif row['membership'] in seen:
+                row_errors['membership'] = "Membership appears more than once in this request."
+            if row['amount_paid'] != committee.monthly_amount:
+                row_errors['amount_paid'] = f"Amount must be exactly {committee.monthly_amount} (no partial or over payments)."
+            seen.add(row['membership'])
+            errors.append(row_errors)
+
+        if any(errors):
+            raise serializers.ValidationError({'contributions': errors})
+        return data
+
+    def create(self, validated_data):
+        for_month = validated_data['for_month']
+        due_date = validated_data['due_date']
+        rows = validated_data['contributions']
+        membership_ids = [row['membership'] for row in rows]
+
+        contributions = []
+        for row in rows:
+            payment_date = row.get('payment_date')
+            contribution = Contribution(
+                membership_id=row['membership'],
+                amount_paid=row['amount_paid'],
+                for_month=for_month,
+                due_date=due_date,
+                payment_date=payment_date,
+                payment_status='PAID' if payment_date else 'PENDING',
+                verified_by_organizer=True,
+            )
+            # Same PAID/LATE rule that Contribution.save applies.
+            contribution.clean()
+            contributions.append(contribution)
+
+        with transaction.atomic():
+            existing = set(Contribution.objects.filter(
+                membership_id__in=membership_ids, for_month=for_month
+            ).values_list('membership_id', flat=True))
+            Contribution.objects.bulk_create(
+                contributions,
+                update_conflicts=True,
+                unique_fields=['membership', 'for_month'],
+                update_fields=[
+                    'amount_paid', 'due_date', 'payment_date', 'payment_status',
+                    'verified_by_organizer', 'updated_at'
+                ],
+            )
+            refresh_membership_ledgers(membership_ids)
+
+        return [
+            {
+                'membership': c.membership_id,
+                'id': c.id,
+                'payment_status': c.payment_status,
+                'result': 'updated' if c.membership_id in existing else 'created',
+            }
+            for c in contributions
+        ]
+
+
+class DashboardMemberSerializer(serializers.Serializer):
+    membership_id = serializers.IntegerField()
+    member_id = serializers.IntegerField()
+    member_name = serializers.CharField()
+
+
+class DashboardMemberBehindSerializer(DashboardMemberSerializer):
+    months_behind = serializers.IntegerField()
+    amount_due = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+
+class DashboardCommitteeSerializer(ProfiledSerializerMixin, serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    status = serializers.CharField()
+    role = serializers.CharField()
+    collected = serializers.DecimalField(max_digits=12, decimal_places=2)
+    outstanding = serializers.DecimalField(max_digits=12, decimal_places=2)
+    late_count = serializers.IntegerField()
+    verified_ratio = serializers.FloatField(allow_null=True)
+    next_payout_candidate = DashboardMemberSerializer(allow_null=True)
+    members_behind = DashboardMemberBehindSerializer(many=True)
@@ -0,0 +1,99 @@
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from account.models import User
+from .cache import invalidate_committees
+from .events import CONTRIBUTION_FIELDS, PAYOUT_FIELDS, publish_row
+from .ledger import refresh_committee_ledgers, refresh_membership_ledgers
+from .models import Committee, CommitteeLedger, Contribution, Membership, MembershipLedger, Payout
+
+
+def _deleted_directly(origin, model):
+    """True when ``origin`` (the object or queryset passed to delete()) is of ``model``."""
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model is model
+
+
+@receiver(post_save, sender=Committee)
+def create_committee_ledger(sender, instance, created, **kwargs):
+    if created:
+        CommitteeLedger.objects.create(committee=instance)
+
+
+@receiver(post_save, sender=Membership)
+def create_membership_ledger(sender, instance, created, **kwargs):
+    if created:
+        MembershipLedger.objects.create(membership=instance)
+
+
+@receiver(post_save, sender=Contribution)
+@receiver(post_save, sender=Payout)
+def refresh_ledger_on_save(sender, instance, **kwargs):
+    refresh_membership_ledgers([instance.membership_id])
+
+
+@receiver(post_delete, sender=Contribution)
+@receiver(post_delete, sender=Payout)
+def refresh_ledger_on_delete(sender, instance, origin=None, **kwargs):
+    # Rows removed by a cascade from their membership are accounted for below.
+    if _deleted_directly(origin, sender):
+        refresh_membership_ledgers([instance.membership_id])
+
+
+@receiver(post_delete, sender=Membership)
+def refresh_committee_ledger_on_membership_delete(sender, instance, origin=None, **kwargs):
+    if _deleted_directly(origin, sender):
+        refresh_committee_ledgers([instance.committee_id])
+    else:
+        # The committee itself may be going away in the same cascade; only
+        # touch ledgers of committees that survive the delete.
+        transaction.on_commit(lambda: refresh_committee_ledgers([instance.committee_id]))
+
+
+@receiver(post_save, sender=Committee)
+@receiver(post_delete, sender=Committee)
+def invalidate_committee_cache(sender, instance, **kwargs):
+    invalidate_committees([instance.id])
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_membership_cache(sender, instance, **kwargs):
+    invalidate_committees([instance.committee_id])
+
+
+# User fields the committee payloads show, through ``full_name``.
+DISPLAYED_USER_FIELDS = {'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_committees(sender, instance, created, update_fields=None, **kwargs):
+    # New users are in no committee yet; password rehashes and the like save fields no payload shows.
+    if created or (update_fields is not None and not DISPLAYED_USER_FIELDS & set(update_fields)):
+        return
+    memberships = Membership.objects.filter(member_id=instance.pk).values('committee_id')
+    committees = Committee.objects.filter(Q(organizer_id=instance.pk) | Q(id__in=memberships))
+    committee_ids = list(committees.values_list('id', flat=True))
+    if committee_ids:
+        # The conditional GET version does not look at users; moving updated_at changes the ETag.
+        Committee.objects.filter(id__in=committee_ids).update(updated_at=timezone.now())
+        invalidate_committees(committee_ids)
+
+
+@receiver(post_save, sender=Contribution)
+@receiver(post_save, sender=Payout)
+def publish_row_on_save(sender, instance, created, **kwargs):
+    fields = CONTRIBUTION_FIELDS if sender is Contribution else PAYOUT_FIELDS
+    publish_row(instance, fields, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Contribution)
+@receiver(post_delete, sender=Payout)
+def publish_row_on_delete(sender, instance, origin=None, **kwargs):
+    # Cascades from a membership or committee leave no stream to tell.
+    if _deleted_directly(origin, sender):
+        fields = CONTRIBUTION_FIELDS if sender is Contribution else PAYOUT_FIELDS
+        publish_row(instance, fields, 'deleted')
@@ -0,0 +1,61 @@
+"""
+Nightly status sweep.
+
+PENDING contributions whose due date has passed are marked OVERDUE, and ACTIVE
+committees past their end date are marked COMPLETED. Both are set-based
+UPDATEs: contributions are swept one chunk of committees per transaction,
+each chunk refreshing the ledgers (and cached payloads) it touched.
+"""
+import time
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate_committees
+from .ledger import refresh_membership_ledgers
+from .models import Committee, Contribution
+
+SWEEP_CHUNK_SIZE = 100
+
+
+def overdue_contributions(today):
+    return Contribution.objects.filter(payment_status='PENDING', payment_date__isnull=True, due_date__lt=today)
+
+
+def sweep(today=None, chunk_size=SWEEP_CHUNK_SIZE, dry_run=False):
+    """Run the sweep as of ``today`` and return counts and timing."""
+    started = time.perf_counter()
+    today = today or timezone.localdate()
+    report = {'date': today.isoformat(), 'committees_swept': 0, 'contributions_marked_overdue': 0,
+              'committees_completed': 0}
+
+    committee_ids = sorted(set(
+        overdue_contributions(today).order_by().values_list('membership__committee_id', flat=True).distinct()
+    ))
+    report['committees_swept'] = len(committee_ids)
+
+    for start in range(0, len(committee_ids), chunk_size):
+        chunk = overdue_contributions(today).filter(membership__committee_id__in=committee_ids[start:start + chunk_size])
+        if dry_run:
+            report['contributions_marked_overdue'] += chunk.count()
+            continue
+        with transaction.atomic():
+            membership_ids = set(chunk.order_by().values_list('membership_id', flat=True).distinct())
+            report['contributions_marked_overdue'] += chunk.update(
+                payment_status='OVERDUE', updated_at=timezone.now()
+            )
+            refresh_membership_ledgers(membership_ids)
+
+    finished = Committee.objects.filter(status='ACTIVE', end_date__lt=today)
+    if dry_run:
+        report['committees_completed'] = finished.count()
+    else:
+        with transaction.atomic():
+            completed_ids = list(finished.values_list('id', flat=True))
+            report['committees_completed'] = Committee.objects.filter(id__in=completed_ids).update(
+                status='COMPLETED', updated_at=timezone.now()
+            )
+            invalidate_committees(completed_ids)
+
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return report
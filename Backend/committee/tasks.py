@@ -0,0 +1,88 @@
+"""
+Background versions of the heavy committee operations. Each task is safe to
+re-run: schedule generation and ledger rebuilds are idempotent, imports
+upsert, and an export overwrites its own file. An import deletes its upload
+once it has succeeded or will not be retried.
+"""
+import datetime
+import tempfile
+from io import StringIO
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from jobs.queue import task
+from .export import export_rows, stream_csv, stream_jsonl, CHUNK_SIZE
+from .importer import import_committee_csv
+from .models import Committee, Contribution, Payout
+from .schedule import generate_schedule
+from .sweeper import sweep
+
+
+def _committee(committee_id):
+    committee = Committee.objects.filter(id=committee_id).first()
+    if committee is None:
+        raise Committee.DoesNotExist(f"Committee {committee_id} does not exist.")
+    return committee
+
+
+@task('committee.generate_schedule')
+def generate_schedule_task(job, committee_id):
+    generate_schedule(_committee(committee_id))
+    return {'committee': committee_id}
+
+
+@task('committee.rebuild_ledger')
+def rebuild_ledger_task(job, committee_id):
+    output = StringIO()
+    call_command('rebuild_ledger', committees=[_committee(committee_id).id], stdout=output)
+    return {'committee': committee_id, 'output': output.getvalue().strip()}
+
+
+@task('committee.export')
+def export_task(job, committee_id, file_format='csv'):
+    committee = _committee(committee_id)
+    total = (
+        Contribution.objects.filter(membership__committee=committee).count() +
+        Payout.objects.filter(membership__committee=committee).count()
+    )
+
+    def rows():
+        for done, row in enumerate(export_rows([committee.id]), 1):
+            if done % CHUNK_SIZE == 0:
+                job.progress(done, total, f"{done} of {total} rows")
+            yield row
+
+    encode = stream_csv if file_format == 'csv' else stream_jsonl
+    name = f'exports/committee-{committee.id}-job-{job.job.id}.{file_format}'
+    with tempfile.TemporaryFile() as buffer:
+        for line in encode(rows()):
+            buffer.write(line.encode())
+        buffer.seek(0)
+        default_storage.delete(name)
+        default_storage.save(name, File(buffer))
+    return {'committee': committee_id, 'rows': total, 'file': name}
+
+
+@task('committee.import')
+def import_task(job, committee_id, file):
+    imported = False
+    try:
+        committee = _committee(committee_id)
+        with default_storage.open(file, 'rb') as upload:
+            report = import_committee_csv(
+                committee, upload, progress=lambda done, size: job.progress(done, size, "Importing rows")
+            )
+        imported = True
+    finally:
+        # A failed attempt that will be retried still needs the upload.
+        if imported or job.final_attempt:
+            default_storage.delete(file)
+    return dict(report, committee=committee_id)
+
+
+@task('committee.sweep_late_payments')
+def sweep_late_payments_task(job, date=None):
+    # Idempotent: a second sweep for the same date finds nothing left to change.
+    return sweep(datetime.date.fromisoformat(date) if date else None)
@@ -1,11 +1,20 @@
 from django.urls import path
 from .views import (
     CommitteeView, MembershipListCreateView, MembershipDetailView,
-    ContributionListCreateView, ContributionDetailView, ContributionVerifyView,
-    PayoutListCreateView, PayoutDetailView, PayoutConfirmView
+    ContributionListCreateView, ContributionDetailView, ContributionVerifyView, ContributionBulkCreateView,
+    PayoutListCreateView, PayoutDetailView, PayoutConfirmView, DashboardView, CacheStatsView, LedgerExportView,
+    CommitteeImportView, CommitteeJobView
     )
+from .async_views import (
+    AsyncCommitteeView, AsyncMembershipListView, AsyncContributionListView, AsyncDashboardView,
+    CommitteeEventStreamView,
+)
 
 urlpatterns = [
+    # Dashboard
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
+
     # Committees
     path('committees/', CommitteeView.as_view(), name='committee-list-create'),
     path('committees/<int:id>/', CommitteeView.as_view(), name='committee-detail'),
@@ -17,11 +26,30 @@ urlpatterns = [
     # Contributions
     path('memberships/<int:membership_id>/contributions/', ContributionListCreateView.as_view(), name='contribution-list-create'),
     path('memberships/<int:membership_id>/contributions/<int:id>/', ContributionDetailView.as_view(), name='contribution-detail'),
+    path('committees/<int:committee_id>/contributions/bulk/', ContributionBulkCreateView.as_view(), name='contribution-bulk-create'),
     # Verify contributions
+    path('contributions/verify/', ContributionVerifyView.as_view(), name='contribution-bulk-verify'),
     path('contributions/<int:id>/verify/', ContributionVerifyView.as_view(), name='contribution-verify'),
 
     # Payouts
     path('committees/<int:committee_id>/payouts/', PayoutListCreateView.as_view(), name='payout-list-create'),
     path('payouts/<int:id>/', PayoutDetailView.as_view(), name='payout-detail'),
     path('payouts/<int:id>/confirm/', PayoutConfirmView.as_view(), name='payout-confirm'),
+
+    # Background jobs
+    path('committees/<int:committee_id>/jobs/', CommitteeJobView.as_view(), name='committee-jobs'),
+
+    # Imports and exports
+    path('committees/<int:committee_id>/import/', CommitteeImportView.as_view(), name='committee-import'),
+    path('export/', LedgerExportView.as_view(), name='ledger-export'),
+    path('committees/<int:committee_id>/export/', LedgerExportView.as_view(), name='committee-ledger-export'),
+
+    # Async (ASGI) read endpoints
+    path('async/dashboard/', AsyncDashboardView.as_view(), name='async-dashboard'),
+    path('async/committees/', AsyncCommitteeView.as_view(), name='async-committee-list'),
+    path('async/committees/<int:id>/', AsyncCommitteeView.as_view(), name='async-committee-detail'),
+    path('async/committees/<int:committee_id>/members/', AsyncMembershipListView.as_view(), name='async-membership-list'),
+    path('async/memberships/<int:membership_id>/contributions/', AsyncContributionListView.as_view(),
+         name='async-contribution-list'),
+    path('async/committees/<int:committee_id>/events/', CommitteeEventStreamView.as_view(), name='committee-events'),
 ]
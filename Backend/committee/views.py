@@ -1,14 +1,36 @@
+from collections import defaultdict
+
+from .access import ORGANIZER, ROLES, committee_access, membership_access
 from .models import Committee, Membership, Contribution, Payout
-from .serializers import CommitteeSerializer, MembershipSerializer, ContributionSerializer, PayoutSerializer
+from .serializers import (
+    CommitteeSerializer, MembershipSerializer, ContributionSerializer, PayoutSerializer,
+    BulkContributionSerializer, ContributionBulkVerifySerializer, DashboardCommitteeSerializer
+)
+from .dashboard import build_dashboard
+from .export import FORMATS, stream_export
+from .importer import import_committee_csv
+from .cache import cached_payload, stats as cache_stats
+from .conditional import conditional_response
+from .events import publish
+from .ledger import refresh_membership_ledgers
+from .schedule import generate_schedule
 from rest_framework import generics, status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from .permissions import IsOrganizer
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.core.files.storage import default_storage
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db import models
+from django.db import transaction
+from django.db.models import Prefetch
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
+from conf.pagination import JoinedAtCursorPagination
+from conf.routers import read_from_replica
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
 
 
 # Create your views here.
@@ -20,11 +42,37 @@ class CommitteeView(generics.ListCreateAPIView, generics.RetrieveUpdateDestroyAP
     queryset = Committee.objects.all().order_by('-id')
     lookup_field = 'id'
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('organizer').with_stats().prefetch_related(
+            Prefetch(
+                'memberships',
+                queryset=Membership.objects.filter(status='ACTIVE').select_related('member'),
+                to_attr='active_memberships',
+            )
+        )
+
     def get(self, request, *args, **kwargs):
         id = self.kwargs.get('id', None)
         if id:
-            return self.retrieve(request, *args, **kwargs)
-        return self.list(request, *args, **kwargs)
+            return conditional_response(request, [id], lambda: self.retrieve(request, *args, **kwargs))
+        with read_from_replica():
+            return conditional_response(request, self.page_ids(request), lambda: self.list(request, *args, **kwargs))
+
+    def page_ids(self, request):
+        """Ids of the committees on the requested page, read without the list's annotations."""
+        page = self.pagination_class().paginate_queryset(self.queryset.only('id'), request, view=self)
+        return [committee.id for committee in page]
+
+    def retrieve(self, request, *args, **kwargs):
+        # The detail payload is the same for every viewer.
+        retrieve = super().retrieve
+        data, hit = cached_payload(
+            self.kwargs['id'], 'detail', 'public', request,
+            lambda: (retrieve(request, *args, **kwargs).data, True)
+        )
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
 
     def perform_create(self, serializer):
         serializer.save(organizer=self.request.user)
@@ -42,37 +90,60 @@ class CommitteeView(generics.ListCreateAPIView, generics.RetrieveUpdateDestroyAP
         new_start = serializer.validated_data.get('start_date', old_start)
         new_duration = serializer.validated_data.get('duration_months', old_duration)
 
-        if new_start != old_start or new_duration != old_duration:
+        dates_changed = new_start != old_start or new_duration != old_duration
+        if dates_changed:
             serializer.validated_data['end_date'] = new_start + relativedelta(months=new_duration)
 
         self.perform_update(serializer)
+
+        # Keep the PENDING schedule in line with the new dates and roster.
+        if dates_changed or 'members' in serializer.validated_data:
+            generate_schedule(serializer.instance)
+
+        # Re-read so the annotated totals and prefetched members reflect the update.
+        serializer = self.get_serializer(self.get_object())
         return Response(serializer.data)
 
 
 class MembershipListCreateView(generics.ListCreateAPIView):
     serializer_class = MembershipSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = JoinedAtCursorPagination
     lookup_field = 'id'
 
+    def get_access(self):
+        return committee_access(self.request, self.kwargs['committee_id']).require(
+            *ROLES, message="You don't have permission to view members of this committee."
+        )
+
     def get_queryset(self):
-        committee_id = self.kwargs['committee_id']
-        committee = get_object_or_404(Committee, id=committee_id)
+        committee = self.get_access().committee
+        return Membership.objects.filter(committee=committee).with_related().with_totals()
 
-        if not (
-            committee.organizer == self.request.user or
-            committee.memberships.filter(member=self.request.user).exists()
-        ):
-            raise PermissionDenied("You don't have permission to view members of this committee.")
+    @read_from_replica()
+    def list(self, request, *args, **kwargs):
+        access = self.get_access()
+        list_members = super().list
 
-        return Membership.objects.filter(committee=committee)
+        def build():
+            response = list_members(request, *args, **kwargs)
+            return response.data, response.status_code == status.HTTP_200_OK
 
-    def perform_create(self, serializer):
-        committee = get_object_or_404(Committee, id=self.kwargs['committee_id'])
+        def respond():
+            data, hit = cached_payload(access.committee.id, 'members', access.role, request, build)
+            response = Response(data)
+            response['X-Cache'] = 'HIT' if hit else 'MISS'
+            return response
 
-        if committee.organizer != self.request.user:
-            raise PermissionDenied("Only the committee organizer can add members.")
+        return conditional_response(request, [access.committee.id], respond)
+
+    def perform_create(self, serializer):
+        committee = committee_access(self.request, self.kwargs['committee_id']).require(
+            ORGANIZER, message="Only the committee organizer can add members."
+        ).committee
 
-        serializer.save(committee=committee)
+        membership = serializer.save(committee=committee)
+        generate_schedule(committee, [membership])
 
 
 class MembershipDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -81,15 +152,19 @@ class MembershipDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'id'
 
     def get_queryset(self):
-        return Membership.objects.filter(committee_id=self.kwargs['committee_id'])
+        return Membership.objects.visible_to(self.request.user).filter(
+            committee_id=self.kwargs['committee_id']
+        ).with_related()
 
     def perform_update(self, serializer):
         membership = serializer.instance
         committee = membership.committee
 
-        if committee.organizer == self.request.user:
-            serializer.save()
-        elif membership.member == self.request.user:
+        if committee.organizer_id == self.request.user.id:
+            membership = serializer.save()
+            if membership.status == 'ACTIVE':
+                generate_schedule(committee, [membership])
+        elif membership.member_id == self.request.user.id:
             new_status = serializer.validated_data.get('status')
             if new_status == 'LEFT':
                 serializer.save()
@@ -99,7 +174,7 @@ class MembershipDetailView(generics.RetrieveUpdateDestroyAPIView):
             raise PermissionDenied("You don't have permission to update this membership.")
 
     def perform_destroy(self, instance):
-        if instance.committee.organizer != self.request.user:
+        if instance.committee.organizer_id != self.request.user.id:
             raise PermissionDenied("Only the committee organizer can remove members.")
         instance.delete()
 
@@ -109,27 +184,29 @@ class ContributionListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
     lookup_field = 'id'
 
-    def get_queryset(self):
-        membership_id = self.kwargs['membership_id']
-        membership = get_object_or_404(Membership, id=membership_id)
-
-        if not (
-            membership.member == self.request.user or
-            membership.committee.organizer == self.request.user
-        ):
-            raise PermissionDenied("You don't have permission to view these contributions.")
+    def get_membership(self, message="You don't have permission to view these contributions."):
+        access = membership_access(self.request, self.kwargs['membership_id'])
+        if not (access.owns_membership or access.is_organizer):
+            raise PermissionDenied(message)
+        return access.membership
 
-        return Contribution.objects.filter(membership=membership).order_by('-id')
+    def get_queryset(self):
+        membership = self.get_membership()
+
+        return Contribution.objects.visible_to(self.request.user).filter(
+            membership=membership
+        ).with_related().order_by('-id')
+
+    @read_from_replica()
+    def list(self, request, *args, **kwargs):
+        membership = self.get_membership()
+        list_contributions = super().list
+        return conditional_response(
+            request, [membership.committee_id], lambda: list_contributions(request, *args, **kwargs)
+        )
 
     def perform_create(self, serializer):
-        membership = get_object_or_404(Membership, id=self.kwargs['membership_id'])
-
-        if not (
-            membership.member == self.request.user or
-            membership.committee.organizer == self.request.user
-        ):
-            raise PermissionDenied("Only the member or organizer can record contributions.")
-
+        membership = self.get_membership("Only the member or organizer can record contributions.")
         serializer.save(membership=membership)
 
 
@@ -139,16 +216,31 @@ class ContributionDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'id'
 
     def get_queryset(self):
-        membership_id = self.kwargs['membership_id']
-        membership = get_object_or_404(Membership, id=membership_id)
-
-        if not (
-            membership.member == self.request.user or
-            membership.committee.organizer == self.request.user
-        ):
+        access = membership_access(self.request, self.kwargs['membership_id'])
+        if not (access.owns_membership or access.is_organizer):
             raise PermissionDenied("You don't have permission to modify this contribution.")
 
-        return Contribution.objects.filter(membership=membership)
+        return Contribution.objects.visible_to(self.request.user).filter(membership=access.membership).with_related()
+
+
+class ContributionBulkCreateView(generics.GenericAPIView):
+    serializer_class = BulkContributionSerializer
+    permission_classes = [IsOrganizer]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['committee'] = self.committee
+        return context
+
+    def post(self, request, *args, **kwargs):
+        self.committee = committee_access(request, self.kwargs['committee_id']).require(
+            ORGANIZER, message="Only the committee organizer can record contributions in bulk."
+        ).committee
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({"results": results}, status=status.HTTP_200_OK)
 
 
 class ContributionVerifyView(generics.GenericAPIView):
@@ -158,15 +250,12 @@ class ContributionVerifyView(generics.GenericAPIView):
     def patch(self, request, *args, **kwargs):
         contribution_id = self.kwargs.get('id')
         if not contribution_id:
-            return Response(
-                {"detail": "Contribution ID is required."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return self.verify_many(request)
 
-        contribution = get_object_or_404(Contribution, id=contribution_id)
+        contribution = get_object_or_404(Contribution.objects.with_related(), id=contribution_id)
 
         # Only the committee organizer can verify
-        if contribution.membership.committee.organizer != request.user:
+        if contribution.membership.committee.organizer_id != request.user.id:
             raise PermissionDenied("Only the organizer can verify this contribution.")
 
         contribution.verified_by_organizer = True
@@ -175,38 +264,112 @@ class ContributionVerifyView(generics.GenericAPIView):
         serializer = self.get_serializer(contribution)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def verify_many(self, request):
+        """
+        Verify a batch of contributions given as ``ids`` or as a ``committee``
+        (optionally narrowed to ``for_month``). Only paid contributions of the
+        organizer's own committees are read, with one query, and the flag is
+        flipped with a single UPDATE; every requested id that was not
+        verified is reported with the reason.
+        """
+        params = ContributionBulkVerifySerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        # Other organizers' rows are reported as not found rather than listed.
+        contributions = Contribution.objects.filter(membership__committee__organizer=request.user)
+        if 'ids' in data:
+            contributions = contributions.filter(id__in=data['ids'])
+        if 'committee' in data:
+            contributions = contributions.filter(membership__committee_id=data['committee'])
+        if 'for_month' in data:
+            contributions = contributions.for_month(data['for_month'])
+
+        rows = contributions.order_by().values_list(
+            'id', 'membership_id', 'membership__committee_id', 'payment_date', 'verified_by_organizer'
+        )
+
+        skipped, to_verify, membership_ids, committees = {}, [], set(), defaultdict(lambda: defaultdict(list))
+        for contribution_id, membership_id, committee_id, payment_date, verified in rows:
+            if verified:
+                skipped[contribution_id] = "already_verified"
+            elif payment_date is None:
+                # Scheduled instalments that have not been paid yet.
+                skipped[contribution_id] = "unpaid"
+            else:
+                to_verify.append(contribution_id)
+                membership_ids.add(membership_id)
+                committees[committee_id][membership_id].append(contribution_id)
+
+        found = set(skipped) | set(to_verify)
+        for contribution_id in data.get('ids', []):
+            if contribution_id not in found:
+                skipped[contribution_id] = "not_found"
+
+        with transaction.atomic():
+            Contribution.objects.filter(id__in=to_verify).update(
+                verified_by_organizer=True, updated_at=timezone.now()
+            )
+            refresh_membership_ledgers(membership_ids)
+            for committee_id, memberships in committees.items():
+                publish(
+                    committee_id, 'contribution',
+                    {'action': 'verified', 'ids': [pk for ids in memberships.values() for pk in ids]},
+                    members={
+                        membership_id: {'action': 'verified', 'ids': ids} for membership_id, ids in memberships.items()
+                    },
+                )
+
+        return Response({
+            "verified": to_verify,
+            "skipped": [{"id": key, "reason": reason} for key, reason in skipped.items()],
+        }, status=status.HTTP_200_OK)
+
 
 class PayoutListCreateView(generics.ListCreateAPIView):
     serializer_class = PayoutSerializer
     permission_classes = [IsAuthenticated]
     lookup_field = 'id'
 
-    def get_queryset(self):
-        committee_id = self.kwargs.get('committee_id')
-        if committee_id:
-            committee = get_object_or_404(Committee, id=committee_id)
-
-            # Only organizer can view all payouts for a committee
-            if committee.organizer != self.request.user:
-                raise PermissionDenied("Only the organizer can view payouts for this committee.")
+    def get_committee(self):
+        # Only organizer can view all payouts for a committee
+        return committee_access(self.request, self.kwargs['committee_id']).require(
+            ORGANIZER, message="Only the organizer can view payouts for this committee."
+        ).committee
 
-            return Payout.objects.filter(membership__committee=committee)
-
-        # For regular users, only show their own payouts
-        return Payout.objects.filter(membership__member=self.request.user)
+    def get_queryset(self):
+        if self.kwargs.get('committee_id'):
+            queryset = Payout.objects.filter(membership__committee=self.get_committee())
+        else:
+            # For regular users, only show their own payouts
+            queryset = Payout.objects.filter(membership__member=self.request.user)
+
+        return queryset.with_related().with_totals().order_by('-id')
+
+    @read_from_replica()
+    def list(self, request, *args, **kwargs):
+        list_payouts = super().list
+        if not self.kwargs.get('committee_id'):
+            return list_payouts(request, *args, **kwargs)
+        return conditional_response(
+            request, [self.get_committee().id], lambda: list_payouts(request, *args, **kwargs)
+        )
 
     def perform_create(self, serializer):
         membership = serializer.validated_data['membership']
 
         # Only organizer can create payouts
-        if membership.committee.organizer != self.request.user:
-            raise PermissionDenied("Only the organizer can create payouts.")
+        committee = committee_access(self.request, membership.committee_id).require(
+            ORGANIZER, message="Only the organizer can create payouts."
+        ).committee
 
         # Calculate total amount (sum of all contributions)
-        total_amount = membership.committee.monthly_amount * membership.committee.duration_months
+        total_amount = committee.monthly_amount * committee.duration_months
 
-        # Verify all contributions are paid
-        unpaid_contributions = membership.contributions.filter(payment_status__in=['PENDING', 'LATE']).exists()
+        # Verify all contributions due so far are paid; later scheduled months are not owed yet.
+        unpaid_contributions = membership.contributions.filter(
+            payment_status__in=['PENDING', 'OVERDUE'], due_date__lte=timezone.localdate()
+        ).exists()
         if unpaid_contributions:
             raise PermissionDenied("Cannot create payout until all contributions are paid.")
 
@@ -220,20 +383,17 @@ class PayoutDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         # Users can only see their own payouts or payouts from committees they organize
-        return Payout.objects.filter(
-            models.Q(membership__member=self.request.user) |
-            models.Q(membership__committee__organizer=self.request.user)
-        )
+        return Payout.objects.visible_to(self.request.user).with_related().with_totals()
 
     def perform_update(self, serializer):
         payout = serializer.instance
 
         # Only organizer can update payout details
-        if payout.membership.committee.organizer != self.request.user:
+        if payout.membership.committee.organizer_id != self.request.user.id:
             raise PermissionDenied("Only the organizer can update this payout.")
 
         # Member can only confirm receipt
-        if payout.membership.member == self.request.user:
+        if payout.membership.member_id == self.request.user.id:
             if 'is_confirmed' in serializer.validated_data:
                 if serializer.validated_data['is_confirmed']:
                     serializer.save(is_confirmed=True)
@@ -243,7 +403,7 @@ class PayoutDetailView(generics.RetrieveUpdateDestroyAPIView):
         serializer.save()
 
     def perform_destroy(self, instance):
-        if instance.membership.committee.organizer != self.request.user:
+        if instance.membership.committee.organizer_id != self.request.user.id:
             raise PermissionDenied("Only the organizer can delete this payout.")
         instance.delete()
 
@@ -253,10 +413,10 @@ class PayoutConfirmView(generics.GenericAPIView):
     permission_classes = [IsOrganizer]
 
     def patch(self, request, *args, **kwargs):
-        payout = get_object_or_404(Payout, id=self.kwargs['id'])
+        payout = get_object_or_404(Payout.objects.with_related(), id=self.kwargs['id'])
 
         # Only the organizer can confirm
-        if payout.membership.committee.organizer != request.user:
+        if payout.membership.committee.organizer_id != request.user.id:
             raise PermissionDenied("Only the organizer can confirm this payout.")
 
         payout.is_confirmed = True
@@ -265,3 +425,121 @@ class PayoutConfirmView(generics.GenericAPIView):
 
         serializer = self.get_serializer(payout)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class DashboardView(generics.GenericAPIView):
+    serializer_class = DashboardCommitteeSerializer
+    permission_classes = [IsAuthenticated]
+
+    @read_from_replica()
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(build_dashboard(request.user), many=True)
+        return Response({"committees": serializer.data}, status=status.HTTP_200_OK)
+
+
+class LedgerExportView(generics.GenericAPIView):
+    """
+    Stream every contribution and payout of one committee, or of all the
+    committees the user organizes, as CSV or JSONL (``?file_format=``).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in FORMATS:
+            raise ValidationError({"file_format": f"Choose one of: {', '.join(FORMATS)}."})
+
+        committee_id = self.kwargs.get('committee_id')
+        if committee_id:
+            committee = committee_access(request, committee_id).require(
+                ORGANIZER, message="Only the organizer can export this committee."
+            ).committee
+            committee_ids = [committee.id]
+            filename = f'committee-{committee.id}-ledger.{file_format}'
+        else:
+            committee_ids = Committee.objects.filter(organizer=request.user).values('id')
+            filename = f'organizer-{request.user.id}-ledger.{file_format}'
+
+        response = StreamingHttpResponse(
+            stream_export(committee_ids, file_format), content_type=FORMATS[file_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class CommitteeImportView(generics.GenericAPIView):
+    """
+    Import members and their historical contributions from an uploaded CSV
+    ``file``. Nothing is saved unless every row is valid.
+    """
+    permission_classes = [IsOrganizer]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        committee = committee_access(request, self.kwargs['committee_id']).require(
+            ORGANIZER, message="Only the committee organizer can import members."
+        ).committee
+
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({"file": "Upload a CSV file."})
+
+        report = import_committee_csv(committee, upload.file)
+        if report['errors']:
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class CommitteeJobView(generics.GenericAPIView):
+    """
+    Queue a heavy committee operation and answer 202 with the job to poll:
+    ``schedule``, ``ledger``, ``export`` (``file_format``) or ``import``
+    (multipart ``file``). An ``Idempotency-Key`` header makes retries of the
+    same request return the job that was already queued.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsOrganizer]
+    parser_classes = [JSONParser, MultiPartParser]
+    TASKS = {
+        'schedule': 'committee.generate_schedule',
+        'ledger': 'committee.rebuild_ledger',
+        'export': 'committee.export',
+        'import': 'committee.import',
+    }
+
+    def post(self, request, *args, **kwargs):
+        committee = committee_access(request, self.kwargs['committee_id']).require(
+            ORGANIZER, message="Only the committee organizer can run committee jobs."
+        ).committee
+
+        name = request.data.get('task')
+        if name not in self.TASKS:
+            raise ValidationError({"task": f"Choose one of: {', '.join(self.TASKS)}."})
+
+        payload = {'committee_id': committee.id}
+        if name == 'export':
+            payload['file_format'] = request.data.get('file_format', 'csv')
+            if payload['file_format'] not in FORMATS:
+                raise ValidationError({"file_format": f"Choose one of: {', '.join(FORMATS)}."})
+        elif name == 'import':
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({"file": "Upload a CSV file."})
+            payload['file'] = default_storage.save(f'imports/committee-{committee.id}.csv', upload)
+
+        key = request.headers.get('Idempotency-Key')
+        job = enqueue(
+            self.TASKS[name], payload, user=request.user,
+            idempotency_key=f'{request.user.id}:{key}' if key else None,
+        )
+        if 'file' in payload and job.payload.get('file') != payload['file']:
+            # A replayed request gets the original job; its own upload is never read.
+            default_storage.delete(payload['file'])
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class CacheStatsView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(cache_stats(), status=status.HTTP_200_OK)
@@ -0,0 +1,313 @@
+"""
+Opt-in request profiling.
+
+``ProfilingMiddleware`` profiles a request when it falls in the
+``PROFILING['SAMPLE_RATE']`` sample (off by default) or carries the
+``PROFILING['HEADER']`` header and comes from a staff user or sends
+``PROFILING['SECRET']`` as the header's value. A profiled request records
+total time, time spent in the database, query count, duplicate query
+fingerprints (repeated identical SQL is the signature of an N+1),
+serializer time and response size. Each profile is logged as one JSON line
+on the ``conf.profiling`` logger and folded into an in-process rolling
+histogram that staff can read from ``ProfilingStatsView``; only requests
+that asked for it with an honoured header get a ``Server-Timing`` header.
+
+Serializer time covers serializers that use ``ProfiledSerializerMixin``.
+Requests that are neither sampled nor ask to be profiled cost nothing when
+sampling is off and one random number otherwise. The middleware runs
+natively under both WSGI and ASGI; queries are attributed to the profile in
+the request's context, which follows async ORM calls onto their threads.
+"""
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.crypto import constant_time_compare
+from rest_framework import generics, status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+logger = logging.getLogger('conf.profiling')
+
+DEFAULTS = {
+    'SAMPLE_RATE': 0,
+    'HEADER': 'HTTP_X_PROFILE',
+    'SECRET': None,
+    'WINDOW_SECONDS': 3600,
+    'SLICE_SECONDS': 60,
+    'N_PLUS_ONE_THRESHOLD': 3,
+}
+
+# Upper bounds, in milliseconds, of the latency histogram buckets.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float('inf'))
+
+_active_profile = ContextVar('active_profile', default=None)
+_whitespace = re.compile(r'\s+')
+
+
+def get_setting(name):
+    return getattr(settings, 'PROFILING', {}).get(name, DEFAULTS[name])
+
+
+class Profile:
+    def __init__(self):
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self.serializing = False
+        self.fingerprints = Counter()
+
+    def execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_ms += (time.perf_counter() - start) * 1000
+            self.fingerprints[_whitespace.sub(' ', sql).strip()] += 1
+
+    @property
+    def query_count(self):
+        return sum(self.fingerprints.values())
+
+    def duplicates(self):
+        return [
+            {'sql': sql[:200], 'count': n}
+            for sql, n in self.fingerprints.most_common() if n > 1
+        ]
+
+
+class RollingHistogram:
+    """Per-endpoint latency histogram and totals over a sliding time window."""
+
+    def __init__(self, window_seconds, slice_seconds):
+        self.window_seconds = window_seconds
+        self.slice_seconds = slice_seconds
+        self.slices = deque()
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, total_ms, db_ms, serializer_ms, queries, n_plus_one, size):
+        now = time.monotonic()
+        with self.lock:
+            if not self.slices or now - self.slices[-1][0] >= self.slice_seconds:
+                self.slices.append((now, {}))
+            while now - self.slices[0][0] > self.window_seconds:
+                self.slices.popleft()
+
+            stats = self.slices[-1][1].setdefault(endpoint, _empty_stats())
+            stats['buckets'][_bucket(total_ms)] += 1
+            stats['count'] += 1
+            stats['total_ms'] += total_ms
+            stats['db_ms'] += db_ms
+            stats['serializer_ms'] += serializer_ms
+            stats['queries'] += queries
+            stats['n_plus_one'] += int(n_plus_one)
+            stats['bytes'] += size
+
+    def snapshot(self):
+        now = time.monotonic()
+        merged = {}
+        with self.lock:
+            for started, endpoints in self.slices:
+                if now - started > self.window_seconds:
+                    continue
+                for endpoint, stats in endpoints.items():
+                    target = merged.setdefault(endpoint, _empty_stats())
+                    for key, value in stats.items():
+                        if key == 'buckets':
+                            target[key] = [a + b for a, b in zip(target[key], value)]
+                        else:
+                            target[key] += value
+
+        return {
+            endpoint: {
+                'count': stats['count'],
+                'p50_ms': _percentile(stats['buckets'], stats['count'], 0.50),
+                'p95_ms': _percentile(stats['buckets'], stats['count'], 0.95),
+                'p99_ms': _percentile(stats['buckets'], stats['count'], 0.99),
+                'avg_ms': round(stats['total_ms'] / stats['count'], 3),
+                'avg_db_ms': round(stats['db_ms'] / stats['count'], 3),
+                'avg_serializer_ms': round(stats['serializer_ms'] / stats['count'], 3),
+                'avg_queries': round(stats['queries'] / stats['count'], 2),
+                'avg_bytes': round(stats['bytes'] / stats['count']),
+                'n_plus_one_requests': stats['n_plus_one'],
+                'histogram': dict(zip([str(bound) for bound in BUCKETS_MS], stats['buckets'])),
+            }
+            for endpoint, stats in merged.items()
+        }
+
+    def clear(self):
+        with self.lock:
+            self.slices.clear()
+
+
+def _empty_stats():
+    return {
+        'buckets': [0] * len(BUCKETS_MS), 'count': 0, 'total_ms': 0.0, 'db_ms': 0.0,
+        'serializer_ms': 0.0, 'queries': 0, 'n_plus_one': 0, 'bytes': 0,
+    }
+
+
+def _bucket(value):
+    for index, bound in enumerate(BUCKETS_MS):
+        if value <= bound:
+            return index
+
+
+def _percentile(buckets, count, fraction):
+    """Upper bound of the bucket holding the requested percentile."""
+    seen = 0
+    for bound, n in zip(BUCKETS_MS, buckets):
+        seen += n
+        if seen >= fraction * count:
+            return bound if bound != float('inf') else None
+    return None
+
+
+histogram = RollingHistogram(get_setting('WINDOW_SECONDS'), get_setting('SLICE_SECONDS'))
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _active_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile.execute(execute, sql, params, many, context)
+
+
+def _install_query_recorder(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class ProfiledSerializerMixin:
+    """
+    Count a serializer's ``to_representation`` towards the active profile's
+    serializer time. Nested serializers inside a timed one are not counted
+    twice; a ``many=True`` list is timed one item at a time.
+    """
+
+    def to_representation(self, instance):
+        profile = _active_profile.get()
+        if profile is None or profile.serializing:
+            return super().to_representation(instance)
+        profile.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            profile.serializer_ms += (time.perf_counter() - start) * 1000
+            profile.serializing = False
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(_install_query_recorder, dispatch_uid='conf.profiling')
+        for connection in connections.all(initialized_only=True):
+            _install_query_recorder(connection)
+
+    def sampled(self):
+        rate = get_setting('SAMPLE_RATE')
+        return rate > 0 and random.random() < rate
+
+    def honours_header(self, request):
+        """
+        Whether the request asked to be profiled and may see its profile.
+        Runs after the view, so ``request.user`` is the user the view
+        authenticated.
+        """
+        value = request.META.get(get_setting('HEADER'))
+        if value is None:
+            return False
+        secret = get_setting('SECRET')
+        if secret and constant_time_compare(value, secret):
+            return True
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sampled = self.sampled()
+        if not sampled and get_setting('HEADER') not in request.META:
+            return self.get_response(request)
+
+        profile = Profile()
+        token = _active_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _active_profile.reset(token)
+        return self.finish(request, response, profile, start, sampled)
+
+    async def __acall__(self, request):
+        sampled = self.sampled()
+        if not sampled and get_setting('HEADER') not in request.META:
+            return await self.get_response(request)
+
+        profile = Profile()
+        token = _active_profile.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _active_profile.reset(token)
+        return self.finish(request, response, profile, start, sampled)
+
+    def finish(self, request, response, profile, start, sampled):
+        total_ms = (time.perf_counter() - start) * 1000
+        exposed = self.honours_header(request)
+        if not (sampled or exposed):
+            # The header came from someone who may not use it.
+            return response
+
+        match = request.resolver_match
+        endpoint = f"{request.method} {match.route if match else '<unresolved>'}"
+        size = 0 if response.streaming else len(response.content)
+        duplicates = profile.duplicates()
+        n_plus_one = bool(duplicates) and duplicates[0]['count'] >= get_setting('N_PLUS_ONE_THRESHOLD')
+
+        histogram.record(
+            endpoint, total_ms, profile.db_ms, profile.serializer_ms, profile.query_count, n_plus_one, size
+        )
+        logger.info(json.dumps({
+            'endpoint': endpoint,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 3),
+            'db_ms': round(profile.db_ms, 3),
+            'serializer_ms': round(profile.serializer_ms, 3),
+            'queries': profile.query_count,
+            'duplicates': duplicates[:5],
+            'n_plus_one': n_plus_one,
+            'bytes': size,
+        }))
+        if exposed:
+            response['Server-Timing'] = (
+                f'total;dur={total_ms:.1f}, db;dur={profile.db_ms:.1f}, '
+                f'serialize;dur={profile.serializer_ms:.1f}'
+            )
+        return response
+
+
+class ProfilingStatsView(generics.GenericAPIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response({
+            'window_seconds': histogram.window_seconds,
+            'endpoints': histogram.snapshot(),
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,49 @@
+"""
+Read-replica routing.
+
+Writes, and every read by default, go to ``default``. Code wrapped in
+``read_from_replica()`` (the list views) reads from the ``replica`` database
+when one is configured, except inside a transaction on the primary, where
+reads must see the transaction's own writes.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = 'replica'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def read_from_replica():
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_reads_active():
+    """True when reads made here are routed to the replica."""
+    return (
+        _replica_reads.get() and
+        REPLICA_ALIAS in connections.settings and
+        not connections[DEFAULT_DB_ALIAS].in_atomic_block
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return REPLICA_ALIAS if replica_reads_active() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both databases hold the same rows.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from datetime import timedelta
 
+from conf.database import database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,10 +45,12 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt",
     "account",
     "committee",
+    "jobs",
     "corsheaders",
 ]
 
 MIDDLEWARE = [
+    "conf.profiling.ProfilingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -60,12 +65,13 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # No BasicAuthentication: it runs the password hasher on every request.
     'DEFAULT_AUTHENTICATION_CLASSES':(
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'account.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
     ),
-
+    'DEFAULT_PAGINATION_CLASS': 'conf.pagination.IdCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 SIMPLE_JWT = {
@@ -94,6 +100,13 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Per-process cache of the users behind JWTs (account.authentication).
+# Saving a user drops its entry here; other processes notice on expiry.
+AUTH_USER_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL_SECONDS': 60,
+}
+
 
 ROOT_URLCONF = "conf.urls"
 
@@ -117,14 +130,114 @@ WSGI_APPLICATION = "conf.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Configured from DATABASE_URL and friends; see conf/database.py.
+
+DATABASES = database_settings(BASE_DIR)
+
+DATABASE_ROUTERS = ["conf.routers.ReplicaRouter"]
 
-DATABASES = {
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
-    }
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Serialized committee and member payloads (committee.cache). Local memory
+    # with LRU culling by default; point it at any Django cache backend to share
+    # entries between processes.
+    "committee": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "committee-payloads",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+COMMITTEE_CACHE_ALIAS = "committee"
+# Seconds to keep payloads read from the replica, which may lag behind writes.
+COMMITTEE_CACHE_REPLICA_TIMEOUT = 5
+
+# Days after an instalment's monthly anniversary before it falls due; the
+# nightly sweep marks unpaid instalments OVERDUE once this has passed.
+COMMITTEE_GRACE_DAYS = 5
+
+
+# Request profiling (conf.profiling). Requests are profiled when they fall in
+# the sample or send an X-Profile header as a staff user or with SECRET as its
+# value; results are logged on the conf.profiling logger and summarised at
+# /profiling/ for staff users. Only header requests get Server-Timing back.
+
+PROFILING = {
+    "SAMPLE_RATE": float(os.environ.get("PROFILING_SAMPLE_RATE", 0)),
+    "HEADER": "HTTP_X_PROFILE",
+    "SECRET": os.environ.get("PROFILING_SECRET"),
+    "WINDOW_SECONDS": 3600,
+    "SLICE_SECONDS": 60,
+    "N_PLUS_ONE_THRESHOLD": 3,
 }
 
+# Background jobs (jobs app). Run them with `python manage.py run_jobs`; set
+# BACKEND to "jobs.backends.RedisBackend" (needs the redis package) to wake
+# idle workers through Redis instead of polling the job table.
+
+JOBS = {
+    "BACKEND": "jobs.backends.DatabaseBackend",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "POLL_INTERVAL": 1.0,
+    "LEASE_SECONDS": 900,
+    "RETRY_BACKOFF_SECONDS": 10,
+    "MAX_ATTEMPTS": 3,
+}
+
+# Live committee events (committee.events), streamed from
+# /committee/async/committees/<id>/events/ on the ASGI app. The local broker
+# only reaches streams in the process that made the write; with several
+# workers use "committee.events.RedisBroker" (needs the redis package).
+
+COMMITTEE_EVENTS = {
+    "BACKEND": "committee.events.LocalBroker",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "QUEUE_SIZE": 100,
+    "KEEPALIVE_SECONDS": 15,
+    "MAX_STREAM_SECONDS": 300,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "conf.profiling": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
+
+# Password hashing (account.hashers). The first hasher hashes new passwords;
+# the others only verify older hashes, which are re-hashed on the next login.
+# Set PASSWORD_HASHER=argon2 (needs argon2-cffi) to hash with Argon2.
+#
+# Costs default to Django's own. Hashes are re-hashed at the configured cost
+# on login, so a lower cost weakens every user's hash; set one only on
+# purpose, e.g. PASSWORD_PBKDF2_ITERATIONS=600000 on a slow host.
+
+PASSWORD_HASHING = {}
+for name in ("PBKDF2_ITERATIONS", "ARGON2_TIME_COST", "ARGON2_MEMORY_COST", "ARGON2_PARALLELISM"):
+    if os.environ.get(f"PASSWORD_{name}"):
+        PASSWORD_HASHING[name] = int(os.environ[f"PASSWORD_{name}"])
+
+PASSWORD_HASHERS = [
+    "account.hashers.PBKDF2PasswordHasher",
+    "account.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if os.environ.get("PASSWORD_HASHER") == "argon2":
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -162,6 +275,9 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploaded imports and generated exports of background jobs.
+MEDIA_ROOT = BASE_DIR / "media"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -17,8 +17,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from conf.profiling import ProfilingStatsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("account/", include("account.urls")),
     path("committee/", include("committee.urls")),
+    path("jobs/", include("jobs.urls")),
+    path("profiling/", ProfilingStatsView.as_view(), name="profiling-stats"),
 ]
@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import Job
+
+# Register your models here.
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'progress', 'attempts', 'run_after', 'created_by', 'created_at', 'finished_at')
+    search_fields = ('name', 'idempotency_key', 'created_by__email')
+    list_filter = ('status', 'name')
+    list_select_related = ('created_by',)
+
+
+admin.site.register(Job, JobAdmin)
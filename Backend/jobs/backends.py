@@ -0,0 +1,45 @@
+"""
+How workers find out about new jobs. The Job table is always the source of
+truth for status, leases and retries; a backend only decides how idle
+workers wait for work.
+"""
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .queue import claim_next, get_setting
+
+
+class DatabaseBackend:
+    """Idle workers poll the job table every ``POLL_INTERVAL`` seconds."""
+
+    def notify(self, job):
+        pass
+
+    def claim(self, worker_id):
+        return claim_next(worker_id)
+
+    def wait(self, timeout):
+        time.sleep(timeout)
+
+
+class RedisBackend(DatabaseBackend):
+    """
+    Idle workers block on a Redis list that ``enqueue`` pushes to, so new
+    jobs start without polling delay. Delayed retries and expired leases are
+    still picked up from the table when the wait times out.
+    """
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("jobs.backends.RedisBackend requires the redis package.")
+        self.client = redis.Redis.from_url(get_setting('REDIS_URL'))
+        self.key = get_setting('REDIS_KEY')
+
+    def notify(self, job):
+        self.client.lpush(self.key, job.id)
+
+    def wait(self, timeout):
+        self.client.brpop(self.key, timeout=max(1, round(timeout)))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import POOLS, Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs on a thread or process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help="Jobs run at the same time.")
+        parser.add_argument('--pool', choices=POOLS, default='thread',
+                            help="Run jobs on threads, on spawned processes or inline in this process.")
+        parser.add_argument('--poll-interval', type=float, help="Seconds an idle worker waits before polling again.")
+        parser.add_argument('--once', action='store_true', help="Exit once no job is due instead of waiting for more.")
+
+    def handle(self, *args, **options):
+        worker = Worker(options['concurrency'], options['pool'], options['poll_interval'])
+        self.stdout.write(f"Worker {worker.worker_id} running jobs on a {options['pool']} pool...")
+        try:
+            processed = worker.run(once=options['once'])
+        except KeyboardInterrupt:
+            worker.stop()
+            processed = worker.processed
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s)."))
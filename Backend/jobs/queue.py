@@ -0,0 +1,185 @@
+"""
+Task registry, enqueueing and execution for background jobs.
+
+Tasks are plain functions registered with ``@task('name')`` in an app's
+``tasks`` module, which the jobs app imports at startup. A task receives a
+``JobContext`` followed by the job's JSON payload as keyword arguments and
+returns a JSON-serialisable result. A failed attempt is retried with
+exponential backoff, and a worker that dies mid-job loses its lease, so a
+task may run more than once for the same payload and must be idempotent.
+
+A running task renews its lease whenever it reports progress; a long task
+that reports nothing for ``LEASE_SECONDS`` is claimed again. An attempt
+whose lease was taken over records nothing when it finishes, so it cannot
+overwrite the state of the attempt that replaced it.
+"""
+import socket
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+DEFAULTS = {
+    'BACKEND': 'jobs.backends.DatabaseBackend',
+    'REDIS_URL': 'redis://localhost:6379/0',
+    'REDIS_KEY': 'jobs:ready',
+    'POLL_INTERVAL': 1.0,
+    'LEASE_SECONDS': 900,
+    'RETRY_BACKOFF_SECONDS': 10,
+    'MAX_ATTEMPTS': 3,
+    'PROGRESS_INTERVAL': 1.0,
+}
+
+_registry = {}
+_backend = None
+
+
+def get_setting(name):
+    return getattr(settings, 'JOBS', {}).get(name, DEFAULTS[name])
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(get_setting('BACKEND'))()
+    return _backend
+
+
+def task(name):
+    """Register the decorated function as the task ``name``."""
+    def register(func):
+        _registry[name] = func
+        return func
+    return register
+
+
+def enqueue(name, payload=None, user=None, idempotency_key=None, max_attempts=None):
+    """
+    Queue the task ``name`` and return its Job. With an ``idempotency_key``,
+    enqueueing the same key again returns the existing job instead.
+    """
+    if name not in _registry:
+        raise ValueError(f"Unknown task: {name}")
+    defaults = {
+        'name': name,
+        'payload': payload or {},
+        'created_by': user,
+        'max_attempts': max_attempts or get_setting('MAX_ATTEMPTS'),
+    }
+    if idempotency_key:
+        job = Job.objects.filter(idempotency_key=idempotency_key).first()
+        if job is not None:
+            return job
+        try:
+            # In a savepoint, so losing the race to a concurrent request leaves the transaction usable.
+            with transaction.atomic():
+                job = Job.objects.create(idempotency_key=idempotency_key, **defaults)
+        except IntegrityError:
+            return Job.objects.get(idempotency_key=idempotency_key)
+    else:
+        job = Job.objects.create(**defaults)
+    transaction.on_commit(lambda: get_backend().notify(job))
+    return job
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{uuid.uuid4().hex[:8]}'
+
+
+def claim_next(worker_id):
+    """
+    Lease the next due job to ``worker_id`` and return its id, or None. A
+    conditional UPDATE makes the claim atomic on every database backend;
+    RUNNING jobs whose lease expired are claimed again.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=get_setting('LEASE_SECONDS'))
+    candidates = Job.objects.filter(
+        Q(status='QUEUED', run_after__lte=now) | Q(status='RUNNING', locked_at__lt=expired)
+    ).order_by('run_after', 'id').values_list('id', 'status', 'locked_at')[:10]
+
+    for job_id, status, locked_at in candidates:
+        claimed = Job.objects.filter(id=job_id, status=status, locked_at=locked_at).update(
+            status='RUNNING', locked_by=worker_id, locked_at=now,
+            attempts=F('attempts') + 1, updated_at=now,
+        )
+        if claimed:
+            return job_id
+    return None
+
+
+class JobContext:
+    """Handed to tasks so they can report progress on their job."""
+
+    def __init__(self, job):
+        self.job = job
+        self._reported_at = 0.0
+
+    @property
+    def final_attempt(self):
+        """True when a failure of this attempt will not be retried."""
+        return self.job.attempts >= self.job.max_attempts
+
+    def progress(self, done, total, message=''):
+        """Record progress and renew this attempt's lease."""
+        percent = min(100, int(done * 100 / total)) if total else 0
+        now = time.monotonic()
+        # Throttle the writes; a tight loop must not turn into an UPDATE per row.
+        if now - self._reported_at < get_setting('PROGRESS_INTERVAL') and percent < 100:
+            return
+        self._reported_at = now
+        _leased(self.job).update(
+            progress=percent, progress_message=message[:255], locked_at=timezone.now(), updated_at=timezone.now()
+        )
+
+
+def _leased(job):
+    """The job's row while the attempt ``job`` was loaded for still holds the lease."""
+    return Job.objects.filter(id=job.id, status='RUNNING', locked_by=job.locked_by, attempts=job.attempts)
+
+
+def execute_job(job_id):
+    """
+    Run a claimed job and record its outcome. Returns True on success; an
+    attempt that lost its lease is dropped and counts as a failure.
+    """
+    close_old_connections()
+    try:
+        job = Job.objects.get(id=job_id)
+        func = _registry.get(job.name)
+        try:
+            if func is None:
+                raise LookupError(f"Unknown task: {job.name}")
+            result = func(JobContext(job), **job.payload)
+        except Exception:
+            _record_failure(job, traceback.format_exc(), retry=func is not None)
+            return False
+
+        return bool(_leased(job).update(
+            status='SUCCEEDED', progress=100, result=result, error='',
+            locked_by='', locked_at=None, finished_at=timezone.now(), updated_at=timezone.now(),
+        ))
+    finally:
+        close_old_connections()
+
+
+def _record_failure(job, error, retry):
+    now = timezone.now()
+    if retry and job.attempts < job.max_attempts:
+        delay = get_setting('RETRY_BACKOFF_SECONDS') * 2 ** (job.attempts - 1)
+        _leased(job).update(
+            status='QUEUED', run_after=now + timedelta(seconds=delay), error=error,
+            locked_by='', locked_at=None, updated_at=now,
+        )
+    else:
+        _leased(job).update(
+            status='FAILED', error=error, locked_by='', locked_at=None, finished_at=now, updated_at=now,
+        )
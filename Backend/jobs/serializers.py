@@ -0,0 +1,21 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'url', 'name', 'status', 'progress', 'progress_message', 'result', 'error',
+            'attempts', 'max_attempts', 'run_after', 'created_at', 'updated_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_url(self, obj):
+        request = self.context.get('request')
+        url = reverse('job-detail', args=[obj.id])
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,202 @@
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from account.models import User
+from committee.models import Committee, Contribution, Membership
+from committee.schedule import generate_schedule
+from .models import Job
+from .queue import JobContext, claim_next, enqueue, execute_job, task
+from .worker import Worker
+
+# Create your tests here.
+
+calls = []
+
+
+@task('tests.flaky')
+def flaky(job, fail_times=0):
+    calls.append(job.job.id)
+    if calls.count(job.job.id) <= fail_times:
+        raise RuntimeError("Transient failure")
+    job.progress(1, 1)
+    return {'calls': calls.count(job.job.id)}
+
+
+@task('tests.reclaimed')
+def reclaimed(job):
+    # Another worker takes the lease over while this attempt is still running.
+    Job.objects.filter(id=job.job.id).update(locked_by='other-worker', attempts=F('attempts') + 1)
+    return {'stale': True}
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+        self.user = User.objects.create(email='organizer@example.com', is_organizer=True)
+
+    def test_failed_attempts_retry_with_backoff(self):
+        job = enqueue('tests.flaky', {'fail_times': 2}, user=self.user, max_attempts=3)
+
+        self.assertEqual(claim_next('worker'), job.id)
+        self.assertFalse(execute_job(job.id))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('QUEUED', 1))
+        self.assertIn('Transient failure', job.error)
+        first_delay = job.run_after - timezone.now()
+        self.assertGreater(first_delay, timedelta(seconds=5))
+        # Not due yet.
+        self.assertIsNone(claim_next('worker'))
+
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+        claim_next('worker')
+        execute_job(job.id)
+        job.refresh_from_db()
+        self.assertGreater(job.run_after - timezone.now(), first_delay)
+
+        Job.objects.filter(id=job.id).update(run_after=timezone.now())
+        self.assertEqual(Worker(pool='inline').run(once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.progress), ('SUCCEEDED', 3, 100))
+        self.assertEqual(job.result, {'calls': 3})
+
+    def test_exhausted_attempts_fail(self):
+        job = enqueue('tests.flaky', {'fail_times': 5}, max_attempts=1)
+        Worker(pool='inline').run(once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIsNotNone(job.finished_at)
+
+    def test_idempotency_key_returns_existing_job(self):
+        first = enqueue('tests.flaky', idempotency_key='same')
+        self.assertEqual(enqueue('tests.flaky', idempotency_key='same').id, first.id)
+        self.assertEqual(Job.objects.count(), 1)
+
+        with self.assertRaises(ValueError):
+            enqueue('tests.unknown')
+
+    def test_concurrent_idempotent_enqueue_returns_the_winner(self):
+        first = enqueue('tests.flaky', idempotency_key='same')
+        # The other request inserted the key between our lookup and our insert.
+        with mock.patch.object(Job.objects, 'filter', return_value=Job.objects.none()):
+            self.assertEqual(enqueue('tests.flaky', idempotency_key='same').id, first.id)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_progress_renews_the_lease(self):
+        job = enqueue('tests.flaky')
+        claim_next('worker')
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(hours=1))
+        job.refresh_from_db()
+        JobContext(job).progress(1, 2)
+        self.assertIsNone(claim_next('other-worker'))
+
+    def test_attempt_that_lost_its_lease_records_nothing(self):
+        job = enqueue('tests.reclaimed')
+        claim_next('worker')
+        self.assertFalse(execute_job(job.id))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.result), ('RUNNING', 'other-worker', None))
+
+    def test_expired_lease_is_reclaimed(self):
+        job = enqueue('tests.flaky')
+        self.assertEqual(claim_next('dead-worker'), job.id)
+        self.assertIsNone(claim_next('worker'))
+
+        Job.objects.filter(id=job.id).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(claim_next('worker'), job.id)
+        job.refresh_from_db()
+        self.assertEqual((job.locked_by, job.attempts), ('worker', 2))
+
+
+@skipIf(connection.vendor == 'sqlite', "In-memory SQLite test databases reject concurrent writers.")
+class ThreadPoolWorkerTests(TransactionTestCase):
+    def test_thread_pool_runs_every_job(self):
+        calls.clear()
+        jobs = [enqueue('tests.flaky') for _ in range(6)]
+        self.assertEqual(Worker(concurrency=3, pool='thread', poll_interval=0.01).run(once=True), 6)
+        self.assertEqual(
+            set(Job.objects.filter(id__in=[job.id for job in jobs]).values_list('status', flat=True)), {'SUCCEEDED'}
+        )
+
+
+class CommitteeJobEndpointTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.organizer = User.objects.create(email='organizer@example.com', is_organizer=True)
+        self.committee = Committee.objects.create(
+            name='Committee', description='Test committee', monthly_amount=Decimal('100.00'),
+            duration_months=3, organizer=self.organizer, start_date=date(2025, 1, 1),
+        )
+        Membership.objects.create(committee=self.committee, member=User.objects.create(email='member@example.com'))
+        generate_schedule(self.committee)
+        self.client = APIClient()
+        self.client.force_authenticate(self.organizer)
+        self.url = reverse('committee-jobs', args=[self.committee.id])
+
+    def run_job(self, data, **extra):
+        response = self.client.post(self.url, data, **extra)
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertEqual(response.data['status'], 'QUEUED')
+        Worker(pool='inline').run(once=True)
+        return self.client.get(response.data['url'])
+
+    def test_export_job_can_be_polled_and_downloaded(self):
+        response = self.run_job({'task': 'export', 'file_format': 'jsonl'}, format='json')
+        self.assertEqual(response.data['status'], 'SUCCEEDED')
+        self.assertEqual(response.data['result']['rows'], 3)
+
+        download = self.client.get(reverse('job-download', args=[response.data['id']]))
+        self.assertEqual(len(b''.join(download.streaming_content).splitlines()), 3)
+
+    def test_import_job(self):
+        upload = SimpleUploadedFile('members.csv', b"email,for_month,payment_date\nnew@example.com,2025-01-01,2025-01-01\n")
+        response = self.run_job({'task': 'import', 'file': upload})
+        self.assertEqual(response.data['status'], 'SUCCEEDED', response.data['error'])
+        self.assertEqual(response.data['result']['users_created'], 1)
+        self.assertEqual(Contribution.objects.filter(membership__member__email='new@example.com').count(), 3)
+        self.assertEqual(os.listdir(os.path.join(self.media, 'imports')), [])
+
+    def test_failed_import_keeps_the_upload_until_the_last_attempt(self):
+        upload = SimpleUploadedFile('members.csv', b"email,for_month\n")
+        with mock.patch('committee.tasks.import_committee_csv', side_effect=RuntimeError('boom')):
+            response = self.client.post(self.url, {'task': 'import', 'file': upload})
+            job = Job.objects.get(id=response.data['id'])
+            Job.objects.filter(id=job.id).update(max_attempts=2)
+            for _ in range(2):
+                self.assertTrue(os.listdir(os.path.join(self.media, 'imports')))
+                Job.objects.filter(id=job.id).update(run_after=timezone.now())
+                Worker(pool='inline').run(once=True)
+        self.assertEqual(Job.objects.get(id=job.id).status, 'FAILED')
+        self.assertEqual(os.listdir(os.path.join(self.media, 'imports')), [])
+
+    def test_replayed_import_does_not_keep_a_second_upload(self):
+        for _ in range(2):
+            upload = SimpleUploadedFile('members.csv', b"email,for_month\n")
+            self.client.post(self.url, {'task': 'import', 'file': upload}, HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(len(os.listdir(os.path.join(self.media, 'imports'))), 1)
+
+    def test_idempotency_key_and_permissions(self):
+        first = self.client.post(self.url, {'task': 'ledger'}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        again = self.client.post(self.url, {'task': 'ledger'}, format='json', HTTP_IDEMPOTENCY_KEY='abc')
+        self.assertEqual(first.data['id'], again.data['id'])
+        self.assertEqual(self.client.post(self.url, {'task': 'nope'}, format='json').status_code, 400)
+
+        self.client.force_authenticate(User.objects.create(email='outsider@example.com', is_organizer=True))
+        self.assertEqual(self.client.post(self.url, {'task': 'ledger'}, format='json').status_code, 403)
+        self.assertEqual(self.client.get(first.data['url']).status_code, 404)
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import JobDetailView, JobDownloadView
+
+urlpatterns = [
+    path('<int:id>/', JobDetailView.as_view(), name='job-detail'),
+    path('<int:id>/download/', JobDownloadView.as_view(), name='job-download'),
+]
@@ -0,0 +1,30 @@
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from rest_framework import generics
+from rest_framework.permissions import IsAuthenticated
+
+from .models import Job
+from .serializers import JobSerializer
+
+# Create your views here.
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'id'
+
+    def get_queryset(self):
+        # Users can only poll the jobs they started.
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(created_by=self.request.user)
+
+
+class JobDownloadView(JobDetailView):
+    def get(self, request, *args, **kwargs):
+        job = self.get_object()
+        name = (job.result or {}).get('file') if job.status == 'SUCCEEDED' else None
+        if not name or not default_storage.exists(name):
+            raise Http404("This job has no file to download.")
+        return FileResponse(default_storage.open(name, 'rb'), as_attachment=True, filename=name.rsplit('/', 1)[-1])
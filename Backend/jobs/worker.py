@@ -0,0 +1,85 @@
+"""
+Job worker: claims due jobs and runs them on a thread pool, a process pool
+or inline in the calling thread.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+
+from .queue import execute_job, get_backend, get_setting, worker_name
+
+POOLS = ('thread', 'process', 'inline')
+
+
+class Worker:
+    def __init__(self, concurrency=4, pool='thread', poll_interval=None, backend=None):
+        if pool not in POOLS:
+            raise ValueError(f"pool must be one of {', '.join(POOLS)}")
+        self.concurrency = concurrency if pool != 'inline' else 1
+        self.pool = pool
+        self.poll_interval = poll_interval if poll_interval is not None else get_setting('POLL_INTERVAL')
+        self.backend = backend or get_backend()
+        self.worker_id = worker_name()
+        self.stop_event = threading.Event()
+        self.processed = 0
+
+    def executor(self):
+        if self.pool == 'process':
+            # Spawned children start clean and set Django up themselves
+            # instead of inheriting this process's database connections.
+            return ProcessPoolExecutor(
+                self.concurrency, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+            )
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix='job')
+
+    def run(self, once=False):
+        """
+        Process jobs until ``stop()`` is called, or with ``once`` until no job
+        is due and none is running. Returns the number of jobs processed.
+        """
+        if self.pool == 'inline':
+            return self._run_inline(once)
+
+        slots = threading.Semaphore(self.concurrency)
+        lock = threading.Lock()
+        running = [0]
+
+        def finished(future):
+            with lock:
+                running[0] -= 1
+            slots.release()
+
+        with self.executor() as executor:
+            while not self.stop_event.is_set():
+                slots.acquire()
+                job_id = self.backend.claim(self.worker_id)
+                if job_id is None:
+                    slots.release()
+                    with lock:
+                        idle = running[0] == 0
+                    if once and idle:
+                        break
+                    self.backend.wait(self.poll_interval)
+                    continue
+                with lock:
+                    running[0] += 1
+                executor.submit(execute_job, job_id).add_done_callback(finished)
+                self.processed += 1
+        return self.processed
+
+    def _run_inline(self, once):
+        while not self.stop_event.is_set():
+            job_id = self.backend.claim(self.worker_id)
+            if job_id is None:
+                if once:
+                    break
+                self.backend.wait(self.poll_interval)
+                continue
+            execute_job(job_id)
+            self.processed += 1
+        return self.processed
+
+    def stop(self):
+        self.stop_event.set()
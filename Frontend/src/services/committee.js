@@ -1,12 +1,12 @@
 import axios from 'axios';
+import { getAllPages } from './pagination';
 
 const API_URL = 'http://127.0.0.1:8000/committee';
 
 // Fetch all committees
 export const getCommittees = async () => {
   try {
-    const response = await axios.get(`${API_URL}/committees/`);
-    return response.data;
+    return await getAllPages(`${API_URL}/committees/`);
   } catch (error) {
     console.error('Failed to fetch committees:', error);
     throw error;
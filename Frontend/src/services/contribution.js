@@ -1,12 +1,12 @@
 import axios from 'axios';
+import { getAllPages } from './pagination';
 
 const API_URL = 'http://127.0.0.1:8000/committee';
 
 // Fetch all contributions for a membership
 export const getContributions = async (membershipId) => {
   try {
-    const response = await axios.get(`${API_URL}/memberships/${membershipId}/contributions/`);
-    return response.data;
+    return await getAllPages(`${API_URL}/memberships/${membershipId}/contributions/`);
   } catch (error) {
     console.error(`Failed to fetch contributions for membership ${membershipId}:`, error);
     throw error;
@@ -1,12 +1,12 @@
 import axios from 'axios';
+import { getAllPages } from './pagination';
 
 const API_URL = 'http://127.0.0.1:8000/committee';
 
 // Fetch all memberships for a committee
 export const getMemberships = async (committeeId) => {
   try {
-    const response = await axios.get(`${API_URL}/committees/${committeeId}/members/`);
-    return response.data;
+    return await getAllPages(`${API_URL}/committees/${committeeId}/members/`);
   } catch (error) {
     console.error(`Failed to fetch memberships for committee ${committeeId}:`, error);
     throw error;
@@ -0,0 +1,16 @@
+import axios from 'axios';
+
+// List endpoints are cursor-paginated: { next, previous, results }.
+// Follow the `next` cursor until it runs out and return every row.
+export const getAllPages = async (url) => {
+  const results = [];
+  let next = url;
+  while (next) {
+    const response = await axios.get(next);
+    results.push(...response.data.results);
+    next = response.data.next;
+  }
+  return results;
+};
+
+export default getAllPages;